@@ -1,10 +1,12 @@
 from __future__ import annotations
 
-from rich import print as rprint
+import logging
 
-from .llm_client import LLMClient
+from .llm_client import ImageInput, LLMClient
 from .schemas import Action, Persona
 
+logger = logging.getLogger(__name__)
+
 
 class LLMUserAgent:
     """Single-agent wrapper that prompts an LLM to emit the next JSON action."""
@@ -13,7 +15,7 @@ class LLMUserAgent:
         self.persona = persona
         self.client = client or LLMClient()
 
-    def step(self, observation: str, screenshot_path: str | None = None) -> Action:
+    def step(self, observation: str, screenshot: ImageInput | None = None) -> Action:
         """Return the next action proposed by the model, with optional visual analysis."""
 
         system_prompt = (
@@ -61,7 +63,7 @@ CRITICAL:
 - Take focused, goal-oriented actions that directly address the remaining success criteria.
 """
 
-        data = self.client.emit_json(system_prompt, user_prompt, image_path=screenshot_path)
+        data = self.client.emit_json(system_prompt, user_prompt, image=screenshot)
         try:
             # Handle various malformed responses from LLM
             # Case 1: LLM wraps in "action" key (extract it)
@@ -108,11 +110,11 @@ CRITICAL:
                 data["target"] = "/"
 
             action = Action(**data)
-        except Exception as exc:  # fallback to report
-            action = Action(
+        except Exception as exc:  # fallback to report; fields are known-good, skip validation
+            action = Action.model_construct(
                 type="report",
                 target="agent/schema",
                 payload={"issue": str(exc), "raw": data},
             )
-        rprint("[bold cyan]Proposed Action[/bold cyan]:", action.model_dump())
+        logger.debug("Proposed action: %s", action)
         return action
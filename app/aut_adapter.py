@@ -28,14 +28,14 @@ class RESTAdapter:
 
     def execute(self, action: Action) -> Tuple[str, float]:
         if action.type == "report":
-            issue = action.payload.get("issue", "") if action.payload else ""
+            issue = action.payload.get("issue", "")
             return f"Report submitted: {issue}", 0.0
 
         method = self._METHOD_MAP.get(action.type, "GET")
         url = self._build_url(action.target)
         request_kwargs, cleanup_handles = self._prepare_request_kwargs(action, method)
 
-        start = time.time()
+        start = time.perf_counter()
         try:
             response = self._session.request(
                 method=method,
@@ -43,10 +43,10 @@ class RESTAdapter:
                 timeout=self.timeout,
                 **request_kwargs,
             )
-            latency = time.time() - start
+            latency = time.perf_counter() - start
             observation = self._format_response(response)
         except requests.RequestException as exc:
-            latency = time.time() - start
+            latency = time.perf_counter() - start
             observation = f"HTTP_ERROR: {exc}"
         finally:
             for handle in cleanup_handles:
@@ -65,7 +65,7 @@ class RESTAdapter:
         return f"{self.base_url}{target}"
 
     def _prepare_request_kwargs(self, action: Action, method: str) -> tuple[dict[str, Any], list[Any]]:
-        payload = action.payload or {}
+        payload = action.payload
         kwargs: dict[str, Any] = {}
         cleanup: list[Any] = []
 
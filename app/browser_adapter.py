@@ -1,10 +1,11 @@
 """Browser adapter for UI-based testing with Playwright."""
 from __future__ import annotations
 
+import asyncio
 import time
 from urllib.parse import urlparse, parse_qs
 from pathlib import Path
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, List, Tuple
 
 from playwright.async_api import async_playwright, Page, Browser, Playwright
 
@@ -27,6 +28,16 @@ class BrowserAdapter:
         self.screenshots_dir.mkdir(parents=True, exist_ok=True)
         # Track that we've already added a product from the search page to avoid repeat adds
         self.search_add_completed = False
+        # Action type -> bound handler coroutine
+        self._handlers = {
+            "navigate": self._handle_navigate,
+            "click": self._handle_click,
+            "fill": self._handle_fill,
+            "scroll": self._handle_scroll,
+            # For compatibility, treat tap as API call or click
+            "tap": self._handle_tap,
+            "report": self._handle_report,
+        }
 
     async def start(self) -> None:
         """Start the browser."""
@@ -51,33 +62,27 @@ class BrowserAdapter:
         if not self.page:
             await self.start()
 
-        start = time.time()
+        start = time.perf_counter()
 
         try:
-            if action.type == "navigate":
-                observation = await self._handle_navigate(action)
-            elif action.type == "click":
-                observation = await self._handle_click(action)
-            elif action.type == "fill":
-                observation = await self._handle_fill(action)
-            elif action.type == "scroll":
-                observation = await self._handle_scroll(action)
-            elif action.type == "tap":
-                # For compatibility, treat tap as API call or click
-                observation = await self._handle_tap(action)
-            elif action.type == "report":
-                issue = action.payload.get("issue", "") if action.payload else ""
-                observation = f"Report submitted: {issue}"
+            handler = self._handlers.get(action.type)
+            if handler:
+                observation = await handler(action)
             else:
                 observation = f"Unknown action type: {action.type}"
 
-            latency = time.time() - start
+            latency = time.perf_counter() - start
             return observation, latency
 
         except Exception as exc:
-            latency = time.time() - start
+            latency = time.perf_counter() - start
             return f"BROWSER_ERROR: {exc}", latency
 
+    async def _handle_report(self, action: Action) -> str:
+        """Record a report action; nothing is sent to the browser."""
+        issue = action.payload.get("issue", "")
+        return f"Report submitted: {issue}"
+
     async def _handle_navigate(self, action: Action) -> str:
         """Handle navigate action - go to a page."""
         target = action.target
@@ -95,7 +100,7 @@ class BrowserAdapter:
 
     async def _handle_click(self, action: Action) -> str:
         """Handle click action - click an element by selector."""
-        selector = action.payload.get("selector") if action.payload else None
+        selector = action.payload.get("selector")
 
         if not selector:
             return "ERROR: No selector provided for click action"
@@ -341,8 +346,8 @@ class BrowserAdapter:
         direction = action.target.lower() if action.target else "down"
         pixels = 500  # Default scroll amount
 
-        if action.payload and "pixels" in action.payload:
-            pixels = action.payload.get("pixels", 500)
+        if "pixels" in action.payload:
+            pixels = action.payload["pixels"]
 
         try:
             # Execute JavaScript to scroll the page
@@ -391,16 +396,16 @@ class BrowserAdapter:
             except Exception as e:
                 return f"TAP_ERROR: Could not tap {target}: {e}"
 
-    async def capture_screenshot(self, session_id: str, turn: int) -> str:
-        """Capture screenshot and return path."""
+    async def capture_screenshot(self, session_id: str, turn: int) -> Tuple[str, bytes]:
+        """Capture screenshot and return its path along with the PNG bytes."""
         if not self.page:
             raise RuntimeError("Browser not started")
 
         # Save screenshot directly in screenshots_dir (already in test folder)
         screenshot_path = self.screenshots_dir / f"turn_{turn}.png"
-        await self.page.screenshot(path=str(screenshot_path))
+        png_bytes = await self.page.screenshot(path=str(screenshot_path))
 
-        return str(screenshot_path)
+        return str(screenshot_path), png_bytes
 
     async def get_current_state(self) -> str:
         """Get the current page state as formatted text."""
@@ -435,3 +440,55 @@ class BrowserAdapter:
         """Extract page title from soup."""
         title_tag = soup.find('title')
         return title_tag.get_text(strip=True) if title_tag else "Untitled"
+
+
+class BrowserPool:
+    """Pool of started BrowserAdapters reused across test sessions.
+
+    Browsers are launched lazily up to `size`; released adapters are reset to
+    about:blank with cookies cleared before being handed to the next session.
+    """
+
+    def __init__(self, size: int | None = None, **adapter_kwargs: Any) -> None:
+        self.size = max(1, size or settings.browser_pool_size)
+        self._adapter_kwargs = adapter_kwargs
+        self._idle: asyncio.Queue[BrowserAdapter] = asyncio.Queue()
+        self._adapters: List[BrowserAdapter] = []
+
+    async def acquire(self, screenshots_dir: str | None = None) -> BrowserAdapter:
+        """Return a started adapter, launching a new browser if the pool has room."""
+        if self._idle.empty() and len(self._adapters) < self.size:
+            adapter = BrowserAdapter(screenshots_dir=screenshots_dir, **self._adapter_kwargs)
+            self._adapters.append(adapter)
+            try:
+                await adapter.start()
+            except Exception:
+                self._adapters.remove(adapter)
+                raise
+            return adapter
+
+        adapter = await self._idle.get()
+        if screenshots_dir:
+            adapter.screenshots_dir = Path(screenshots_dir)
+            adapter.screenshots_dir.mkdir(parents=True, exist_ok=True)
+        return adapter
+
+    async def release(self, adapter: BrowserAdapter) -> None:
+        """Reset an adapter's page state and return it to the pool."""
+        try:
+            await adapter.page.goto("about:blank")
+            await adapter.page.context.clear_cookies()
+        except Exception:
+            # Broken browser: drop it so the next acquire launches a fresh one
+            self._adapters.remove(adapter)
+            await adapter.stop()
+            return
+        adapter.search_add_completed = False
+        self._idle.put_nowait(adapter)
+
+    async def close(self) -> None:
+        """Stop every browser owned by the pool."""
+        adapters, self._adapters = self._adapters, []
+        self._idle = asyncio.Queue()
+        for adapter in adapters:
+            await adapter.stop()
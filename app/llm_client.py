@@ -5,7 +5,7 @@ import json
 import os
 import re
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Optional, Union
 
 from dotenv import load_dotenv
 from openai import OpenAI
@@ -15,6 +15,35 @@ from config import load_model_config
 # Load environment variables from .env file
 load_dotenv(Path(__file__).parent.parent / "config" / ".env")
 
+_MEDIA_TYPES = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".webp": "image/webp"}
+
+
+class EncodedImage:
+    """Screenshot bytes shared by every agent in a turn, base64-encoded at most once."""
+
+    __slots__ = ("data", "media_type", "_b64")
+
+    def __init__(self, data: bytes, media_type: str = "image/png") -> None:
+        self.data = data
+        self.media_type = media_type
+        self._b64: Optional[str] = None
+
+    @classmethod
+    def from_path(cls, image_path: str) -> "EncodedImage":
+        """Load an image from disk, inferring the media type from its extension."""
+        with open(image_path, "rb") as image_file:
+            data = image_file.read()
+        return cls(data, _MEDIA_TYPES.get(Path(image_path).suffix.lower(), "image/png"))
+
+    @property
+    def b64(self) -> str:
+        if self._b64 is None:
+            self._b64 = base64.b64encode(self.data).decode("utf-8")
+        return self._b64
+
+
+ImageInput = Union[str, EncodedImage]
+
 
 class LLMClient:
     """Wrapper around LLM providers (OpenAI, Google, Anthropic, xAI, Ollama) with vision support."""
@@ -43,6 +72,8 @@ class LLMClient:
         
         self.model = model_info.get("name", "gpt-4o")
         self.provider = model_info.get("provider", "openai").lower()
+        # Models marked `vision: false` in the config never receive screenshots
+        self.vision = bool(model_info.get("vision", True))
         self.temperature = float(cfg.get("temperature", 0.2))
         self.max_retries = int(cfg.get("max_retries", 2))
         
@@ -133,24 +164,32 @@ class LLMClient:
         
         return api_key
 
-    def emit_json(self, system: str, user: str, image_path: Optional[str] = None) -> dict[str, Any]:
-        """Request a single JSON object from the model, optionally with vision."""
-        
+    def emit_json(self, system: str, user: str, image: Optional[ImageInput] = None) -> dict[str, Any]:
+        """Request a single JSON object from the model, optionally with vision.
+
+        Args:
+            image: Screenshot path or pre-loaded EncodedImage; ignored for non-vision models
+        """
+        if not self.vision:
+            image = None
+        elif isinstance(image, str):
+            image = EncodedImage.from_path(image)
+
         if self.client_type == "google":
-            return self._emit_json_google(system, user, image_path)
+            return self._emit_json_google(system, user, image)
         elif self.client_type == "anthropic":
-            return self._emit_json_anthropic(system, user, image_path)
+            return self._emit_json_anthropic(system, user, image)
         else:
-            return self._emit_json_openai(system, user, image_path)
+            return self._emit_json_openai(system, user, image)
     
-    def _emit_json_openai(self, system: str, user: str, image_path: Optional[str] = None) -> dict[str, Any]:
+    def _emit_json_openai(self, system: str, user: str, image: Optional[EncodedImage] = None) -> dict[str, Any]:
         """OpenAI/Ollama implementation."""
         # Build message content
-        if image_path:
+        if image:
             # Vision-enabled message
             user_content = [
                 {"type": "text", "text": user},
-                {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{self._encode_image(image_path)}"}},
+                {"type": "image_url", "image_url": {"url": f"data:{image.media_type};base64,{image.b64}"}},
             ]
         else:
             # Text-only message
@@ -175,7 +214,7 @@ class LLMClient:
                 last_err = exc
         raise RuntimeError(f"emit_json failed after retries. Last error: {last_err}")
     
-    def _emit_json_google(self, system: str, user: str, image_path: Optional[str] = None) -> dict[str, Any]:
+    def _emit_json_google(self, system: str, user: str, image: Optional[EncodedImage] = None) -> dict[str, Any]:
         """Google Gemini implementation using new google.genai SDK."""
         from google.genai import types
 
@@ -185,17 +224,13 @@ class LLMClient:
         last_err: Optional[Exception] = None
         for _ in range(self.max_retries + 1):
             try:
-                if image_path:
-                    # Load image as base64 or file
-                    with open(image_path, 'rb') as f:
-                        image_data = f.read()
-
+                if image:
                     # Use new API with image
                     response = self.client.models.generate_content(
                         model=self.model,
                         contents=[
                             types.Part.from_text(full_prompt),
-                            types.Part.from_bytes(data=image_data, mime_type="image/png")
+                            types.Part.from_bytes(data=image.data, mime_type=image.media_type)
                         ],
                         config=types.GenerateContentConfig(
                             temperature=self.temperature
@@ -216,33 +251,20 @@ class LLMClient:
                 last_err = exc
         raise RuntimeError(f"emit_json failed after retries. Last error: {last_err}")
     
-    def _emit_json_anthropic(self, system: str, user: str, image_path: Optional[str] = None) -> dict[str, Any]:
+    def _emit_json_anthropic(self, system: str, user: str, image: Optional[EncodedImage] = None) -> dict[str, Any]:
         """Anthropic Claude implementation."""
         last_err: Optional[Exception] = None
         for _ in range(self.max_retries + 1):
             try:
-                if image_path:
+                if image:
                     # Build content with image for Claude
-                    with open(image_path, "rb") as image_file:
-                        image_data = base64.b64encode(image_file.read()).decode("utf-8")
-                    
-                    # Determine media type
-                    if image_path.lower().endswith('.png'):
-                        media_type = "image/png"
-                    elif image_path.lower().endswith(('.jpg', '.jpeg')):
-                        media_type = "image/jpeg"
-                    elif image_path.lower().endswith('.webp'):
-                        media_type = "image/webp"
-                    else:
-                        media_type = "image/png"  # Default
-                    
                     content = [
                         {
                             "type": "image",
                             "source": {
                                 "type": "base64",
-                                "media_type": media_type,
-                                "data": image_data,
+                                "media_type": image.media_type,
+                                "data": image.b64,
                             },
                         },
                         {
@@ -269,12 +291,6 @@ class LLMClient:
                 last_err = exc
         raise RuntimeError(f"emit_json failed after retries. Last error: {last_err}")
 
-    @staticmethod
-    def _encode_image(image_path: str) -> str:
-        """Encode image to base64 string."""
-        with open(image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode("utf-8")
-
     @staticmethod
     def _extract_json(raw: str) -> dict[str, Any]:
         """Parse the first JSON object within the raw model output."""
@@ -2,19 +2,24 @@
 from __future__ import annotations
 
 import json
+import logging
 from typing import Any, Dict, List, Tuple
 
 from rich import print as rprint
 
 from config import load_model_config
 from .agent import LLMUserAgent
-from .llm_client import LLMClient
+from .llm_client import EncodedImage, ImageInput, LLMClient
 from .schemas import Action, Persona
 
+logger = logging.getLogger(__name__)
+
 
 class AgentProposal:
     """Represents a single agent's action proposal with confidence."""
 
+    __slots__ = ("agent_id", "action", "confidence", "reasoning")
+
     def __init__(self, agent_id: int, action: Action, confidence: float, reasoning: str):
         self.agent_id = agent_id
         self.action = action
@@ -85,56 +90,61 @@ class MultiAgentCommittee:
         for i, model_name in enumerate(self.agent_models):
             rprint(f"  [cyan]Agent {i+1}:[/cyan] {model_name}")
 
-    def decide(self, observation: str, screenshot_path: str | None = None) -> Tuple[Action, List[Dict[str, Any]], Dict[str, float]]:
+    def decide(self, observation: str, screenshot: ImageInput | None = None) -> Tuple[Action, List[Dict[str, Any]], Dict[str, float]]:
         """
         Multi-round committee decision process.
         
+        The screenshot is loaded and base64-encoded once, then shared by every
+        vision-capable agent in both rounds; text-only models never receive it.
+
         Returns:
             Tuple of (consensus_action, all_proposals, confidence_scores)
         """
-        rprint("\n[bold cyan]═══ COMMITTEE DISCUSSION ═══[/bold cyan]")
+        logger.debug("Committee discussion started")
+        if isinstance(screenshot, str):
+            screenshot = EncodedImage.from_path(screenshot)
         
         # Round 1: Independent proposals
-        rprint("\n[yellow]Round 1: Independent Proposals[/yellow]")
-        round1_proposals = self._round1_independent(observation, screenshot_path)
+        logger.debug("Round 1: Independent Proposals")
+        round1_proposals = self._round1_independent(observation, screenshot)
         
         # Round 2: Discussion and refinement
-        rprint("\n[yellow]Round 2: Discussion & Refinement[/yellow]")
-        round2_proposals = self._round2_discussion(observation, screenshot_path, round1_proposals)
+        logger.debug("Round 2: Discussion & Refinement")
+        round2_proposals = self._round2_discussion(observation, screenshot, round1_proposals)
         
         # Round 3: Final consensus vote
-        rprint("\n[yellow]Round 3: Consensus Vote[/yellow]")
+        logger.debug("Round 3: Consensus Vote")
         consensus_action, confidence_scores = self._round3_consensus(round2_proposals)
         
         # Collect all proposals for logging
         all_proposals = [p.to_dict() for p in round1_proposals + round2_proposals]
         
-        rprint(f"\n[bold green]✓ Consensus reached: {consensus_action.type} → {consensus_action.target}[/bold green]")
+        logger.info("Consensus reached: %s → %s", consensus_action.type, consensus_action.target)
         return consensus_action, all_proposals, confidence_scores
 
-    def _round1_independent(self, observation: str, screenshot_path: str | None) -> List[AgentProposal]:
+    def _round1_independent(self, observation: str, screenshot: EncodedImage | None) -> List[AgentProposal]:
         """Round 1: Each agent proposes independently."""
         proposals = []
         
         for i, agent in enumerate(self.agents):
             try:
-                action = agent.step(observation, screenshot_path)
+                action = agent.step(observation, screenshot if agent.client.vision else None)
                 # Assign default confidence (can be extracted from model output in future)
                 confidence = 0.8
                 model_name = self.agent_models[i]
                 reasoning = f"Agent {i+1} ({model_name}) independent analysis"
                 proposal = AgentProposal(i + 1, action, confidence, reasoning)
                 proposals.append(proposal)
-                rprint(f"  [cyan]Agent {i+1} ({model_name}):[/cyan] {action.type} → {action.target[:50]}... (conf: {confidence:.2f})")
+                logger.debug("Agent %d (%s): %s → %s (conf: %.2f)", i + 1, model_name, action.type, action.target[:50], confidence)
             except Exception as e:
-                rprint(f"  [red]Agent {i+1} ({self.agent_models[i]}) failed:[/red] {e}")
+                logger.warning("Agent %d (%s) failed: %s", i + 1, self.agent_models[i], e)
         
         return proposals
 
     def _round2_discussion(
         self, 
         observation: str,
-        screenshot_path: str | None,
+        screenshot: EncodedImage | None,
         round1_proposals: List[AgentProposal]
     ) -> List[AgentProposal]:
         """Round 2: Agents see others' proposals and refine."""
@@ -158,7 +168,7 @@ Consider: Are you changing your mind? Sticking with your original proposal?
             try:
                 # Add discussion context to observation
                 enhanced_observation = f"{observation}\n\n{discussion_context}"
-                action = agent.step(enhanced_observation, screenshot_path)
+                action = agent.step(enhanced_observation, screenshot if agent.client.vision else None)
                 
                 # Check if agent changed their mind
                 original = round1_proposals[i] if i < len(round1_proposals) else None
@@ -171,10 +181,12 @@ Consider: Are you changing your mind? Sticking with your original proposal?
                 proposal = AgentProposal(i + 1, action, confidence, reasoning)
                 refined_proposals.append(proposal)
                 
-                status = "[yellow]changed[/yellow]" if changed else "[green]confirmed[/green]"
-                rprint(f"  [cyan]Agent {i+1} ({model_name}):[/cyan] {action.type} → {action.target[:50]}... ({status})")
+                logger.debug(
+                    "Agent %d (%s): %s → %s (%s)",
+                    i + 1, model_name, action.type, action.target[:50], "changed" if changed else "confirmed",
+                )
             except Exception as e:
-                rprint(f"  [red]Agent {i+1} ({self.agent_models[i]}) failed in discussion:[/red] {e}")
+                logger.warning("Agent %d (%s) failed in discussion: %s", i + 1, self.agent_models[i], e)
         
         return refined_proposals
 
@@ -195,7 +207,7 @@ Consider: Are you changing your mind? Sticking with your original proposal?
         for key, voters in action_votes.items():
             total_confidence = sum(p.confidence for p in voters)
             vote_scores[key] = total_confidence
-            rprint(f"  [dim]{key}[/dim] → {len(voters)} votes, total confidence: {total_confidence:.2f}")
+            logger.debug("%s → %d votes, total confidence: %.2f", key, len(voters), total_confidence)
         
         # Winner is highest confidence score
         winning_key = max(vote_scores, key=vote_scores.get)
@@ -209,7 +221,7 @@ Consider: Are you changing your mind? Sticking with your original proposal?
         }
         confidence_scores["consensus_strength"] = vote_scores[winning_key] / len(proposals)
         
-        rprint(f"  [bold]Winner:[/bold] {winning_key} (score: {vote_scores[winning_key]:.2f})")
+        logger.debug("Winner: %s (score: %.2f)", winning_key, vote_scores[winning_key])
         
         return consensus_action, confidence_scores
 
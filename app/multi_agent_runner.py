@@ -1,17 +1,169 @@
 """Multi-agent committee-based test session runner."""
 from __future__ import annotations
 
-from typing import Dict, List
+import asyncio
+import logging
+import sys
+from collections import Counter, deque
+from typing import Any, Dict, Iterator, List, NamedTuple
 
 from rich import print as rprint
 
 from config import settings
-from .browser_adapter import BrowserAdapter
+from .browser_adapter import BrowserPool
+from .llm_client import EncodedImage
 from .multi_agent_committee import MultiAgentCommittee
 from .schemas import Persona, Action
 from .storage import SessionStorage
 from .validators import validate_action
 
+logger = logging.getLogger(__name__)
+
+# Interned tokens compared on every turn by the guardrail and loop-detection checks
+_CLICK = sys.intern("click")
+_FILL = sys.intern("fill")
+_REPORT = sys.intern("report")
+_ADD_TO_CART = sys.intern("add-to-cart")
+_MINPRICE = sys.intern("#minPrice")
+_MAXPRICE = sys.intern("#maxPrice")
+
+# Progress criteria inferred from browser state, tracked as bits in an int
+NAV_PRODUCTS = 1 << 0
+ADDED_TO_CART = 1 << 1
+VIEWED_CART = 1 << 2
+
+_CRITERIA_BITS = (
+    (NAV_PRODUCTS, "Navigate to products page and view product listings"),
+    (ADDED_TO_CART, "Add at least one product to cart"),
+    (VIEWED_CART, "View cart to verify the item was successfully added"),
+)
+
+
+def _criteria_from_flags(flags: int) -> set[str]:
+    """Expand a progress bitset into the set of completed criterion strings."""
+    return {criterion for bit, criterion in _CRITERIA_BITS if flags & bit}
+
+
+class Allow(NamedTuple):
+    """Loop check passed; `warning` is set when a repeat was tolerated."""
+    warning: str = ""
+
+
+class Block(NamedTuple):
+    """Loop check failed; the session should abort with `reason`."""
+    reason: str
+
+
+ALLOW = Allow()
+
+# Browsers are shared across sessions in this process; see shutdown_browser_pool()
+_BROWSER_POOL = BrowserPool()
+
+
+async def shutdown_browser_pool() -> None:
+    """Close all pooled browsers. Call once when no more sessions will run."""
+    await _BROWSER_POOL.close()
+
+
+class ActionHistory:
+    """Recent actions plus running aggregates over the last three of them.
+
+    The aggregates are updated as actions enter and leave the three-action
+    window, so per-turn progress and loop checks are lookups, not rescans.
+    """
+
+    __slots__ = ("_actions", "_recent_keys", "_recent_clicks", "_recent_add_to_cart")
+
+    WINDOW = 3
+
+    def __init__(self, maxlen: int = 5) -> None:
+        self._actions: deque[Dict[str, Any]] = deque(maxlen=maxlen)
+        self._recent_keys: Counter[tuple[str, str]] = Counter()
+        self._recent_clicks: Counter[str] = Counter()
+        self._recent_add_to_cart = 0
+
+    def append(self, action: Dict[str, Any]) -> None:
+        self._actions.append(action)
+        self._update(action, 1)
+        if len(self._actions) > self.WINDOW:
+            self._update(self._actions[-self.WINDOW - 1], -1)
+
+    def _update(self, action: Dict[str, Any], delta: int) -> None:
+        key = (action["type"], action["target"])
+        self._recent_keys[key] += delta
+        if not self._recent_keys[key]:
+            del self._recent_keys[key]
+        if action["type"] == _CLICK:
+            self._recent_clicks[action["target"]] += delta
+            if not self._recent_clicks[action["target"]]:
+                del self._recent_clicks[action["target"]]
+        if _ADD_TO_CART in str(action["target"]).lower():
+            self._recent_add_to_cart += delta
+
+    @property
+    def has_recent_add_to_cart(self) -> bool:
+        return self._recent_add_to_cart > 0
+
+    @property
+    def recent_unique_actions(self) -> int:
+        """Number of distinct (type, target) pairs in the last three actions."""
+        return len(self._recent_keys)
+
+    def recent_clicks(self, target: str) -> int:
+        """Number of clicks on `target` in the last three actions."""
+        return self._recent_clicks.get(target, 0)
+
+    def __len__(self) -> int:
+        return len(self._actions)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._actions)
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        return self._actions[index]
+
+
+def _classify_loop(action: Action, action_history: ActionHistory) -> Allow | Block:
+    """Decide whether repeating `action` after `action_history` is a loop.
+
+    Same action with a different fill payload (e.g. a new security payload) is
+    allowed, as is retrying after a failure or repeating a successful click once.
+    """
+    if not action_history:
+        return ALLOW
+
+    last_action = action_history[-1]
+    if action.type != last_action["type"] or action.target != last_action["target"]:
+        return ALLOW
+
+    # If last action failed, allow retry with same or different approach
+    if not last_action.get("success", True):
+        return Allow("Retrying action after previous failure - allowing")
+
+    if action.type == _FILL and action.payload:
+        last_payload = last_action.get("payload")
+        last_payload_value = last_payload.get("value", "") if isinstance(last_payload, dict) else ""
+        if last_payload_value != action.payload.get("value", ""):
+            return Allow("Same action with different payload - allowing (testing different security payload)")
+
+        # Same action, same payload - allow only if other actions were taken in between
+        if action_history.recent_unique_actions <= 1:
+            return Block(
+                f"Loop detected: Agents attempted to repeat action '{action.type} -> {action.target}' with same payload immediately."
+            )
+        return Allow("Same action repeated, but other actions were taken - allowing")
+
+    if action.type == _CLICK and last_action.get("success", False):
+        # A successful click may be intentional (e.g. adding multiple items);
+        # only block when the same click keeps repeating
+        recent_same_clicks = action_history.recent_clicks(action.target)
+        if recent_same_clicks >= 2:
+            return Block(f"Loop detected: Agents clicked '{action.target}' {recent_same_clicks + 1} times in a row.")
+        return Allow("Same click action repeated - allowing (might be adding multiple items)")
+
+    # For other non-fill actions, same action+target is a loop
+    return Block(f"Loop detected: Agents attempted to repeat action '{action.type} -> {action.target}' immediately.")
+
 
 async def run_multi_agent_session(
     persona: Persona,
@@ -27,6 +179,9 @@ async def run_multi_agent_session(
         num_agents: Number of agents in committee (default 3 distinct models)
     """
 
+    # Personas are not mutated during a session; defaults are omitted from the result
+    persona_dump = persona.model_dump(exclude_defaults=True)
+
     # Use scenario's max_turns if specified, otherwise use settings default
     max_turns = scenario.get("max_turns", settings.max_turns)
     
@@ -40,143 +195,144 @@ async def run_multi_agent_session(
     storage = SessionStorage()
     session_id = storage.start_session(persona=persona, scenario=scenario)
     rprint(f"\n[green]✓ Session ID:[/green] {session_id}")
+    log_task = asyncio.create_task(storage.drain())
 
     # Get screenshots directory from storage (inside test folder)
     screenshots_dir = storage.get_screenshots_dir()
-    browser = BrowserAdapter(screenshots_dir=screenshots_dir)
-    await browser.start()
-    rprint("[green]✓ Browser started (visible mode)[/green]")
-
-    committee = MultiAgentCommittee(persona, num_agents=num_agents, models=models)
-
-    # Navigate to initial page
-    initial_url = scenario.get("initial_url", "/")
-    # Handle both absolute and relative URLs
-    if initial_url.startswith("http"):
-        full_url = initial_url
-    else:
-        full_url = f"{browser.base_url}{initial_url}"
-    await browser.page.goto(full_url)
-    await browser.page.wait_for_load_state("networkidle")
-    rprint(f"[green]✓ Navigated to {initial_url}[/green]")
-
-    # Main testing loop
-    scenario_context = scenario.get("initial_state", "You are testing an e-commerce store.")
-    test_objective = scenario.get("test_objective", "")
-    success_criteria = scenario.get("success_criteria", [])
-    success_criteria_text = "\n".join([f"  - {criterion}" for criterion in success_criteria]) if success_criteria else "  - Complete the primary objective"
-    success = True
-    turns_executed = 0
+    browser = None
+    try:
+        browser = await _BROWSER_POOL.acquire(screenshots_dir=screenshots_dir)
+        rprint("[green]✓ Browser ready (visible mode)[/green]")
+        committee = MultiAgentCommittee(persona, num_agents=num_agents, models=models)
+
+        # Navigate to initial page
+        initial_url = scenario.get("initial_url", "/")
+        # Handle both absolute and relative URLs
+        if initial_url.startswith("http"):
+            full_url = initial_url
+        else:
+            full_url = f"{browser.base_url}{initial_url}"
+        await browser.page.goto(full_url)
+        await browser.page.wait_for_load_state("networkidle")
+        rprint(f"[green]✓ Navigated to {initial_url}[/green]")
+
+        # Main testing loop
+        scenario_context = scenario.get("initial_state", "You are testing an e-commerce store.")
+        test_objective = scenario.get("test_objective", "")
+        success_criteria = scenario.get("success_criteria", [])
+        success_criteria_text = "\n".join([f"  - {criterion}" for criterion in success_criteria]) if success_criteria else "  - Complete the primary objective"
+        success = True
+        turns_executed = 0
     
-    # Track progress through criteria
-    completed_criteria = set()
-    action_history = []  # Track recent actions to infer progress
-    security_tests_attempted = set()  # Track which security tests have been attempted
-    failed_selectors = {}  # Track selectors that have failed multiple times: {selector: count}
-    # State guardrails to keep flow on track
-    search_add_done = False
-    min_filled = False
-    max_filled = False
-    filtered_add_done = False
-    cart_visited = False
+        # Track progress through criteria
+        progress_flags = 0
+        completed_criteria: set[str] = set()  # Rebuilt from progress_flags when it changes
+        completed_flags = 0
+        action_history = ActionHistory()  # Track recent actions to infer progress
+        security_tests_attempted = set()  # Track which security tests have been attempted
+        failed_selectors = {}  # Track selectors that have failed multiple times: {selector: count}
+        # State guardrails to keep flow on track
+        search_add_done = False
+        min_filled = False
+        max_filled = False
+        filtered_add_done = False
+        cart_visited = False
     
-    # Check if this is a security test scenario
-    scenario_name = scenario.get("name", "").lower()
-    is_security_test = "security" in scenario_name or "security" in scenario.get("description", "").lower()
-
-    for turn_idx in range(1, max_turns + 1):
-        turns_executed = turn_idx
-        rprint(f"\n[bold yellow]{'='*60}[/bold yellow]")
-        rprint(f"[bold yellow]Turn {turn_idx}/{max_turns}[/bold yellow]")
-        rprint(f"[bold yellow]{'='*60}[/bold yellow]")
-
-        # Capture screenshot BEFORE agent decision
-        screenshot_path = await browser.capture_screenshot(session_id, turn_idx)
-        rprint(f"[dim]📸 Screenshot saved: {screenshot_path}[/dim]")
-
-        # Get current page state and prepend scenario context
-        browser_state = await browser.get_current_state()
-        current_url = browser.page.url.replace(browser.base_url, "")
-        if "/cart" in current_url:
-            cart_visited = True
+        # Check if this is a security test scenario
+        scenario_name = scenario.get("name", "").lower()
+        is_security_test = "security" in scenario_name or "security" in scenario.get("description", "").lower()
+
+        for turn_idx in range(1, max_turns + 1):
+            turns_executed = turn_idx
+            logger.info("Turn %d/%d", turn_idx, max_turns)
+
+            # Capture screenshot BEFORE agent decision
+            screenshot_path, screenshot_png = await browser.capture_screenshot(session_id, turn_idx)
+            logger.debug("Screenshot saved: %s", screenshot_path)
+
+            # Get current page state and prepend scenario context
+            browser_state = await browser.get_current_state()
+            current_url = browser.page.url.replace(browser.base_url, "")
+            if "/cart" in current_url:
+                cart_visited = True
         
-        # Update progress tracking based on current state and action history
-        # Check if we've navigated to products page
-        if "/products" in current_url and "Navigate to products page" not in completed_criteria:
-            completed_criteria.add("Navigate to products page and view product listings")
+            # Update progress tracking based on current state and action history
+            # Check if we've navigated to products page
+            if "/products" in current_url:
+                progress_flags |= NAV_PRODUCTS
         
-        # Check if we've added to cart (based on action history)
-        recent_add_to_cart = any(
-            "add-to-cart" in str(action.get("target", "")).lower() 
-            for action in action_history[-3:]  # Check last 3 actions
-        )
-        if recent_add_to_cart and "Add at least one product to cart" not in completed_criteria:
-            completed_criteria.add("Add at least one product to cart")
+            # Check if we've added to cart (based on action history)
+            if action_history.has_recent_add_to_cart:  # Checks the last 3 actions
+                progress_flags |= ADDED_TO_CART
         
-        # Check if we've viewed cart
-        if "/cart" in current_url and "View cart to verify" not in completed_criteria:
-            completed_criteria.add("View cart to verify the item was successfully added")
+            # Check if we've viewed cart
+            if "/cart" in current_url:
+                progress_flags |= VIEWED_CART
+
+            if progress_flags != completed_flags:
+                completed_criteria = _criteria_from_flags(progress_flags)
+                completed_flags = progress_flags
         
-        # Build progress section
-        remaining_criteria = [c for c in success_criteria if c not in completed_criteria]
-        progress_text = ""
-        if completed_criteria:
-            progress_text = "\n=== PROGRESS ===\n"
-            progress_text += "Completed:\n"
-            for criterion in completed_criteria:
-                progress_text += f"  ✓ {criterion}\n"
-        if remaining_criteria:
-            progress_text += "\nRemaining:\n"
-            for criterion in remaining_criteria:
-                progress_text += f"  - {criterion}\n"
-        else:
-            progress_text += "\n✓ ALL CRITERIA COMPLETED! Use 'report' action to signal completion.\n"
+            # Build progress section
+            remaining_criteria = [c for c in success_criteria if c not in completed_criteria]
+            progress_parts: List[str] = []
+            if progress_flags:
+                progress_parts.append("\n=== PROGRESS ===\nCompleted:\n")
+                progress_parts.extend(f"  ✓ {criterion}\n" for bit, criterion in _CRITERIA_BITS if progress_flags & bit)
+            if remaining_criteria:
+                progress_parts.append("\nRemaining:\n")
+                progress_parts.extend(f"  - {criterion}\n" for criterion in remaining_criteria)
+            else:
+                progress_parts.append("\n✓ ALL CRITERIA COMPLETED! Use 'report' action to signal completion.\n")
+            progress_text = "".join(progress_parts)
         
-        # Format action history with failure hints
-        history_text = ""
-        if action_history:
-            history_text = "\n=== ACTION HISTORY (Last 5 actions) ===\n"
-            for i, action in enumerate(action_history):
-                payload_info = ""
-                if action.get("payload") and isinstance(action["payload"], dict):
-                    value = action["payload"].get("value", "")
-                    if value:
-                        # Truncate long payloads for display
-                        display_value = value[:50] + "..." if len(value) > 50 else value
-                        payload_info = f" (value: {display_value})"
-
-                success_indicator = "✓" if action.get("success", True) else "✗"
-                history_text += f"{i+1}. {success_indicator} {action['type']} -> {action['target']}{payload_info}\n"
-
-            # Add hints if last action failed
-            if action_history and not action_history[-1].get("success", True):
-                last_action = action_history[-1]
-                history_text += "\n⚠️  LAST ACTION FAILED! Consider:\n"
-                if last_action["type"] == "click":
-                    history_text += "  - Try a simpler selector (e.g., '.add-to-cart' instead of complex nth-child)\n"
-                    history_text += "  - Use [data-testid] attributes if available\n"
-                    history_text += "  - Try scrolling first if element is off-screen\n"
-                    history_text += "  - Try a different action if selector is incorrect\n"
-
-                # Show failed selectors to avoid
-                if failed_selectors:
-                    history_text += "\n❌ FAILED SELECTORS (DO NOT USE THESE):\n"
-                    for selector, count in failed_selectors.items():
-                        history_text += f"  - {selector} (failed {count}x)\n"
-        else:
-            history_text = "\n=== ACTION HISTORY ===\nNo actions taken yet.\n"
+            # Format action history with failure hints
+            if action_history:
+                history_parts = ["\n=== ACTION HISTORY (Last 5 actions) ===\n"]
+                for i, action in enumerate(action_history):
+                    payload_info = ""
+                    if action.get("payload") and isinstance(action["payload"], dict):
+                        value = action["payload"].get("value", "")
+                        if value:
+                            # Truncate long payloads for display
+                            display_value = value[:50] + "..." if len(value) > 50 else value
+                            payload_info = f" (value: {display_value})"
+
+                    success_indicator = "✓" if action.get("success", True) else "✗"
+                    history_parts.append(f"{i+1}. {success_indicator} {action['type']} -> {action['target']}{payload_info}\n")
+
+                # Add hints if last action failed
+                if action_history and not action_history[-1].get("success", True):
+                    last_action = action_history[-1]
+                    history_parts.append("\n⚠️  LAST ACTION FAILED! Consider:\n")
+                    if last_action["type"] == _CLICK:
+                        history_parts.append(
+                            "  - Try a simpler selector (e.g., '.add-to-cart' instead of complex nth-child)\n"
+                            "  - Use [data-testid] attributes if available\n"
+                            "  - Try scrolling first if element is off-screen\n"
+                            "  - Try a different action if selector is incorrect\n"
+                        )
+
+                    # Show failed selectors to avoid
+                    if failed_selectors:
+                        history_parts.append("\n❌ FAILED SELECTORS (DO NOT USE THESE):\n")
+                        history_parts.extend(f"  - {selector} (failed {count}x)\n" for selector, count in failed_selectors.items())
+                history_text = "".join(history_parts)
+            else:
+                history_text = "\n=== ACTION HISTORY ===\nNo actions taken yet.\n"
         
-        # Add security test tracking for security scenarios
-        security_test_info = ""
-        scenario_name = scenario.get("name", "").lower()
-        is_security_test = "security" in scenario_name or "security" in scenario.get("description", "").lower()
-        if is_security_test and security_tests_attempted:
-            security_test_info = "\n=== SECURITY TESTS ATTEMPTED ===\n"
-            for test in sorted(security_tests_attempted):
-                security_test_info += f"  ✓ {test}\n"
-            security_test_info += "\nContinue testing different security vulnerabilities. Don't repeat the same test with the same payload.\n"
-
-        observation = f"""=== TEST CONTEXT ===
+            # Add security test tracking for security scenarios
+            security_test_info = ""
+            scenario_name = scenario.get("name", "").lower()
+            is_security_test = "security" in scenario_name or "security" in scenario.get("description", "").lower()
+            if is_security_test and security_tests_attempted:
+                security_test_info = "".join((
+                    "\n=== SECURITY TESTS ATTEMPTED ===\n",
+                    *(f"  ✓ {test}\n" for test in sorted(security_tests_attempted)),
+                    "\nContinue testing different security vulnerabilities. Don't repeat the same test with the same payload.\n",
+                ))
+
+            observation = f"""=== TEST CONTEXT ===
 {scenario_context}
 
 === PRIMARY OBJECTIVE ===
@@ -191,295 +347,226 @@ IMPORTANT: Use the "report" action with type="report" and target="task_complete"
 
 === CURRENT PAGE STATE ===
 {browser_state}"""
-        # Print full observation for debugging (or truncate if too long)
-        observation_preview = observation[:800] + "..." if len(observation) > 800 else observation
-        rprint(f"\n[blue]Observation:[/blue]\n{observation_preview}")
+            # Print full observation for debugging (or truncate if too long)
+            observation_preview = observation[:800] + "..." if len(observation) > 800 else observation
+            logger.debug("Observation:\n%s", observation_preview)
+
+            # Committee decision
+            try:
+                consensus_action, all_proposals, confidence_scores = committee.decide(
+                    observation, EncodedImage(screenshot_png)
+                )
+
+                # Guardrail actions are built from literals, so skip re-validating them
+                # Hard guardrail: once search add is done, force move to products (no more adds on search)
+                if (
+                    search_add_done
+                    and "/search" in current_url
+                    and _ADD_TO_CART in str(consensus_action.target)
+                ):
+                    consensus_action = Action.model_construct(type="navigate", target="/products", payload={})
+
+                # Hard guardrail: after filters filled, prioritize adding filtered item, not new searches
+                if min_filled and max_filled and not filtered_add_done:
+                    if consensus_action.type == _FILL and str(consensus_action.target).startswith("#searchInput"):
+                        consensus_action = Action.model_construct(type="click", target=".add-to-cart", payload={"selector": ".add-to-cart"})
+                    if consensus_action.type == _CLICK and "search-button" in str(consensus_action.target):
+                        consensus_action = Action.model_construct(type="click", target=".add-to-cart", payload={"selector": ".add-to-cart"})
+                # If trying to add-to-cart before both filters are set, force completing filters first
+                if search_add_done and not (min_filled and max_filled) and consensus_action.type == _CLICK and _ADD_TO_CART in str(consensus_action.target):
+                    if not min_filled:
+                        consensus_action = Action.model_construct(type="fill", target="#minPrice", payload={"selector": "#minPrice", "value": "10"})
+                    elif not max_filled:
+                        consensus_action = Action.model_construct(type="fill", target="#maxPrice", payload={"selector": "#maxPrice", "value": "200"})
+
+                # Hard guardrail: after filtered add, go to cart
+                if filtered_add_done and not cart_visited:
+                    if not (consensus_action.type == _CLICK and ("go-to-cart" in str(consensus_action.target) or "/cart" in str(consensus_action.target))):
+                        consensus_action = Action.model_construct(type="click", target=".go-to-cart", payload={"selector": ".go-to-cart"})
+            
+                # Action is final after the guardrails; serialize it once for every log path
+                consensus_dump = consensus_action.model_dump()
+
+                # LOOP DETECTION: Check if we are repeating the exact same action as the last one
+                loop_decision = _classify_loop(consensus_action, action_history)
+                if isinstance(loop_decision, Block):
+                    error_msg = loop_decision.reason
+                    logger.error("%s Aborting session to prevent infinite loop.", error_msg)
+
+                    storage.log_turn_nowait(
+                        turn=turn_idx,
+                        action_type=consensus_action.type,
+                        action_target=consensus_action.target,
+                        screenshot_path=screenshot_path,
+                        agent_proposals=all_proposals,
+                        consensus_action=consensus_dump,
+                        confidence_scores=confidence_scores,
+                        success=False,
+                        latency=0.0,
+                        safety_pass=True,
+                        validators=[f"loop_detected:{error_msg}"],
+                        conclusion="",
+                        page_state=observation,
+                        issues_found=error_msg,
+                        issues_description=error_msg,
+                    )
+                    success = False
+                    break
+                if loop_decision.warning:
+                    logger.info(loop_decision.warning)
+
+            except Exception as e:
+                logger.error("Committee decision failed: %s", e)
+                success = False
+                break
 
-        # Committee decision
-        try:
-            consensus_action, all_proposals, confidence_scores = committee.decide(
-                observation, screenshot_path
-            )
+            # Validate action
+            # Disable safety checks for security testing scenarios
+            passed, reasons, safety_reasons = validate_action(consensus_action, persona, disable_safety_checks=is_security_test)
+            safety_pass = len(safety_reasons) == 0
+
+            if not passed:
+                logger.error("Validation failed: %s", "; ".join(reasons))
+
+                storage.log_turn_nowait(
+                    turn=turn_idx,
+                    action_type=consensus_action.type,
+                    action_target=consensus_action.target,
+                    screenshot_path=screenshot_path,
+                    agent_proposals=all_proposals,
+                    consensus_action=consensus_dump,
+                    confidence_scores=confidence_scores,
+                    success=False,
+                    latency=0.0,
+                    safety_pass=safety_pass,
+                    validators=reasons,
+                    conclusion="",
+                    page_state=observation,
+                    issues_found="; ".join(reasons),
+                    issues_description="; ".join(reasons),
+                )
+                success = False
+                break
 
-            # Hard guardrail: once search add is done, force move to products (no more adds on search)
-            if (
-                search_add_done
-                and "/search" in current_url
-                and "add-to-cart" in str(consensus_action.target)
-            ):
-                consensus_action = Action(type="navigate", target="/products", payload=None)
-
-            # Hard guardrail: after filters filled, prioritize adding filtered item, not new searches
-            if min_filled and max_filled and not filtered_add_done:
-                if consensus_action.type == "fill" and str(consensus_action.target).startswith("#searchInput"):
-                    consensus_action = Action(type="click", target=".add-to-cart", payload={"selector": ".add-to-cart"})
-                if consensus_action.type == "click" and "search-button" in str(consensus_action.target):
-                    consensus_action = Action(type="click", target=".add-to-cart", payload={"selector": ".add-to-cart"})
-            # If trying to add-to-cart before both filters are set, force completing filters first
-            if search_add_done and not (min_filled and max_filled) and consensus_action.type == "click" and "add-to-cart" in str(consensus_action.target):
-                if not min_filled:
-                    consensus_action = Action(type="fill", target="#minPrice", payload={"selector": "#minPrice", "value": "10"})
-                elif not max_filled:
-                    consensus_action = Action(type="fill", target="#maxPrice", payload={"selector": "#maxPrice", "value": "200"})
-
-            # Hard guardrail: after filtered add, go to cart
-            if filtered_add_done and not cart_visited:
-                if not (consensus_action.type == "click" and ("go-to-cart" in str(consensus_action.target) or "/cart" in str(consensus_action.target))):
-                    consensus_action = Action(type="click", target=".go-to-cart", payload={"selector": ".go-to-cart"})
+            logger.debug("Validation passed")
+
+            # Execute action
+            try:
+                new_observation, latency = await browser.execute(consensus_action)
+                logger.info("Response: %s...", new_observation[:300])
+                logger.debug("Latency: %.3fs", latency)
+
+                # Extract conclusion if this is a report action
+                conclusion = ""
+                if consensus_action.type == _REPORT:
+                    conclusion = consensus_action.target
+
+                storage.log_turn_nowait(
+                    turn=turn_idx,
+                    action_type=consensus_action.type,
+                    action_target=consensus_action.target,
+                    screenshot_path=screenshot_path,
+                    agent_proposals=all_proposals,
+                    consensus_action=consensus_dump,
+                    confidence_scores=confidence_scores,
+                    success=True,
+                    latency=latency,
+                    safety_pass=safety_pass,
+                    validators=["ok"],
+                    conclusion=conclusion,
+                    page_state=new_observation,
+                    issues_found="",
+                    issues_description="",
+                )
+
+                # Track action in history for progress inference
+                action_payload = consensus_action.payload
+                # Check if action succeeded or failed based on response
+                action_succeeded = not any(err in new_observation for err in ["ERROR", "CLICK_ERROR", "FILL_ERROR", "NAVIGATE_ERROR"])
+
+                # Update guardrail flags based on successful actions
+                if action_succeeded:
+                    if consensus_action.type == _CLICK and _ADD_TO_CART in str(consensus_action.target):
+                        if "/search" in current_url:
+                            search_add_done = True
+                        if min_filled and max_filled:
+                            filtered_add_done = True
+                    if consensus_action.type == _FILL and str(consensus_action.target) == _MINPRICE:
+                        min_filled = True
+                    if consensus_action.type == _FILL and str(consensus_action.target) == _MAXPRICE:
+                        max_filled = True
+                    if "/cart" in browser.page.url.replace(browser.base_url, ""):
+                        cart_visited = True
+
+                # Track failed selectors for click actions
+                if not action_succeeded and consensus_action.type == _CLICK:
+                    selector = consensus_action.target
+                    failed_selectors[selector] = failed_selectors.get(selector, 0) + 1
+
+                # Keeps only the last 5 actions
+                action_history.append({
+                    "type": consensus_action.type,
+                    "target": consensus_action.target,
+                    "payload": action_payload,
+                    "turn": turn_idx,
+                    "success": action_succeeded
+                })
             
-            # LOOP DETECTION: Check if we are repeating the exact same action as the last one
-            # Allow same action if payload is different (e.g., testing different security payloads)
-            # Also allow retry if the last action failed (e.g., timeout, wrong selector)
-            if action_history:
-                last_action = action_history[-1]
-                is_same_action = (consensus_action.type == last_action["type"] and
-                                 consensus_action.target == last_action["target"])
-
-                # If last action failed, allow retry with same or different approach
-                if is_same_action and not last_action.get("success", True):
-                    rprint(f"[yellow]⚠ Retrying action after previous failure - allowing[/yellow]")
-                elif is_same_action:
-                    # Check if payload is different (for fill actions, different values are allowed)
-                    if consensus_action.type == "fill" and consensus_action.payload:
-                        last_payload_value = last_action.get("payload", {}).get("value", "") if isinstance(last_action.get("payload"), dict) else ""
-                        current_payload_value = consensus_action.payload.get("value", "") if consensus_action.payload else ""
-                        
-                        # If payload values are different, allow it (testing different security payloads)
-                        if last_payload_value != current_payload_value:
-                            rprint(f"[yellow]⚠ Same action with different payload - allowing (testing different security payload)[/yellow]")
+                # Track security tests attempted
+                if is_security_test:
+                    if consensus_action.type == _FILL and action_payload:
+                        value = action_payload.get("value", "")
+                        target = consensus_action.target
+                        # Identify test type from payload
+                        if "<script" in value.lower() or "alert" in value.lower():
+                            security_tests_attempted.add(f"XSS test in {target}")
+                        elif "' OR" in value.upper() or "1=1" in value:
+                            security_tests_attempted.add(f"SQL injection test in {target}")
+                        elif value.startswith("-") and target in (_MINPRICE, _MAXPRICE):
+                            security_tests_attempted.add(f"Negative value test in {target}")
+                        elif not value.replace("-", "").replace(".", "").isdigit() and target in (_MINPRICE, _MAXPRICE):
+                            security_tests_attempted.add(f"Non-numeric test in {target}")
                         else:
-                            # Same action, same payload - check if we've done other actions in between
-                            # Allow if we've done at least 2 different actions since last time
-                            recent_actions = action_history[-3:] if len(action_history) >= 3 else action_history
-                            unique_actions = set((a["type"], a["target"]) for a in recent_actions)
-                            
-                            if len(unique_actions) <= 1:
-                                # We're stuck in a loop with no variation
-                                error_msg = f"Loop detected: Agents attempted to repeat action '{consensus_action.type} -> {consensus_action.target}' with same payload immediately."
-                                rprint(f"\n[bold red]🛑 {error_msg}[/bold red]")
-                                rprint("[red]Aborting session to prevent infinite loop.[/red]")
-                                
-                                storage.log_turn(
-                                    turn=turn_idx,
-                                    action_type=consensus_action.type,
-                                    action_target=consensus_action.target,
-                                    screenshot_path=screenshot_path,
-                                    agent_proposals=all_proposals,
-                                    consensus_action=consensus_action.model_dump(),
-                                    confidence_scores=confidence_scores,
-                                    success=False,
-                                    latency=0.0,
-                                    safety_pass=True,
-                                    validators=[f"loop_detected:{error_msg}"],
-                                    conclusion="",
-                                    page_state=observation,
-                                    issues_found=error_msg,
-                                    issues_description=error_msg,
-                                )
-                                success = False
-                                break
-                            else:
-                                rprint(f"[yellow]⚠ Same action repeated, but other actions were taken - allowing[/yellow]")
-                    else:
-                        # For non-fill actions, check if it's actually a problematic loop
-                        # Allow if: 1) page state changed, 2) action succeeded and could reasonably be done again
-                        # For click actions specifically, check if this is a reasonable repetition
-                        should_block_loop = True
-                        if consensus_action.type == "click" and last_action.get("success", False):
-                            # If last click succeeded, this might be intentional (e.g., adding multiple items)
-                            # Only block if we've done the same click multiple times in a row
-                            recent_same_clicks = sum(
-                                1 for a in action_history[-3:]
-                                if a["type"] == "click" and a["target"] == consensus_action.target
-                            )
-                            if recent_same_clicks >= 2:
-                                # Clicking same thing 3+ times in a row is definitely a loop
-                                error_msg = f"Loop detected: Agents clicked '{consensus_action.target}' {recent_same_clicks + 1} times in a row."
-                                rprint(f"\n[bold red]🛑 {error_msg}[/bold red]")
-                                rprint("[red]Aborting session to prevent infinite loop.[/red]")
-                            else:
-                                # Allow one repetition (might be adding another item, etc.)
-                                rprint(f"[yellow]⚠ Same click action repeated - allowing (might be adding multiple items)[/yellow]")
-                                should_block_loop = False
-                        else:
-                            # For other non-fill actions, same action+target is a loop
-                            error_msg = f"Loop detected: Agents attempted to repeat action '{consensus_action.type} -> {consensus_action.target}' immediately."
-                            rprint(f"\n[bold red]🛑 {error_msg}[/bold red]")
-                            rprint("[red]Aborting session to prevent infinite loop.[/red]")
-
-                        if should_block_loop:
-                            storage.log_turn(
-                                turn=turn_idx,
-                                action_type=consensus_action.type,
-                                action_target=consensus_action.target,
-                                screenshot_path=screenshot_path,
-                                agent_proposals=all_proposals,
-                                consensus_action=consensus_action.model_dump(),
-                                confidence_scores=confidence_scores,
-                                success=False,
-                                latency=0.0,
-                                safety_pass=True,
-                                validators=[f"loop_detected:{error_msg}"],
-                                conclusion="",
-                                page_state=observation,
-                                issues_found=error_msg,
-                                issues_description=error_msg,
-                            )
-                            success = False
-                            break
-                    
-        except Exception as e:
-            rprint(f"\n[red]❌ Committee decision failed: {e}[/red]")
-            success = False
-            break
-
-        # Validate action
-        # Disable safety checks for security testing scenarios
-        passed, reasons, safety_reasons = validate_action(consensus_action, persona, disable_safety_checks=is_security_test)
-        safety_pass = len(safety_reasons) == 0
-
-        if not passed:
-            rprint(f"\n[red]❌ Validation failed:[/red]")
-            for reason in reasons:
-                rprint(f"  - {reason}")
-
-            storage.log_turn(
-                turn=turn_idx,
-                action_type=consensus_action.type,
-                action_target=consensus_action.target,
-                screenshot_path=screenshot_path,
-                agent_proposals=all_proposals,
-                consensus_action=consensus_action.model_dump(),
-                confidence_scores=confidence_scores,
-                success=False,
-                latency=0.0,
-                safety_pass=safety_pass,
-                validators=reasons,
-                conclusion="",
-                page_state=observation,
-                issues_found="; ".join(reasons),
-                issues_description="; ".join(reasons),
-            )
-            success = False
-            break
+                            security_tests_attempted.add(f"Input validation test in {target}")
+                observation = new_observation
 
-        rprint("[green]✓ Validation passed[/green]")
-
-        # Execute action
-        try:
-            new_observation, latency = await browser.execute(consensus_action)
-            rprint(f"\n[magenta]Response:[/magenta] {new_observation[:300]}...")
-            rprint(f"[dim]⏱️  Latency: {latency:.3f}s[/dim]")
-
-            # Extract conclusion if this is a report action
-            conclusion = ""
-            if consensus_action.type == "report":
-                conclusion = consensus_action.target
-
-            storage.log_turn(
-                turn=turn_idx,
-                action_type=consensus_action.type,
-                action_target=consensus_action.target,
-                screenshot_path=screenshot_path,
-                agent_proposals=all_proposals,
-                consensus_action=consensus_action.model_dump(),
-                confidence_scores=confidence_scores,
-                success=True,
-                latency=latency,
-                safety_pass=safety_pass,
-                validators=["ok"],
-                conclusion=conclusion,
-                page_state=new_observation,
-                issues_found="",
-                issues_description="",
-            )
-
-            # Track action in history for progress inference
-            action_payload = consensus_action.payload if consensus_action.payload else {}
-            # Check if action succeeded or failed based on response
-            action_succeeded = not any(err in new_observation for err in ["ERROR", "CLICK_ERROR", "FILL_ERROR", "NAVIGATE_ERROR"])
-
-            # Update guardrail flags based on successful actions
-            if action_succeeded:
-                if consensus_action.type == "click" and "add-to-cart" in str(consensus_action.target):
-                    if "/search" in current_url:
-                        search_add_done = True
-                    if min_filled and max_filled:
-                        filtered_add_done = True
-                if consensus_action.type == "fill" and str(consensus_action.target) == "#minPrice":
-                    min_filled = True
-                if consensus_action.type == "fill" and str(consensus_action.target) == "#maxPrice":
-                    max_filled = True
-                if "/cart" in browser.page.url.replace(browser.base_url, ""):
-                    cart_visited = True
-
-            # Track failed selectors for click actions
-            if not action_succeeded and consensus_action.type == "click":
-                selector = consensus_action.target
-                failed_selectors[selector] = failed_selectors.get(selector, 0) + 1
-
-            action_history.append({
-                "type": consensus_action.type,
-                "target": consensus_action.target,
-                "payload": action_payload,
-                "turn": turn_idx,
-                "success": action_succeeded
-            })
+                # Check if task is complete
+                if consensus_action.type == _REPORT:
+                    logger.info("Task reported as complete by agents")
+                    break
             
-            # Track security tests attempted
-            if is_security_test:
-                if consensus_action.type == "fill" and action_payload:
-                    value = action_payload.get("value", "")
-                    target = consensus_action.target
-                    # Identify test type from payload
-                    if "<script" in value.lower() or "alert" in value.lower():
-                        security_tests_attempted.add(f"XSS test in {target}")
-                    elif "' OR" in value.upper() or "1=1" in value:
-                        security_tests_attempted.add(f"SQL injection test in {target}")
-                    elif value.startswith("-") and target in ["#minPrice", "#maxPrice"]:
-                        security_tests_attempted.add(f"Negative value test in {target}")
-                    elif not value.replace("-", "").replace(".", "").isdigit() and target in ["#minPrice", "#maxPrice"]:
-                        security_tests_attempted.add(f"Non-numeric test in {target}")
-                    else:
-                        security_tests_attempted.add(f"Input validation test in {target}")
-            # Keep only last 5 actions
-            if len(action_history) > 5:
-                action_history.pop(0)
-
-            observation = new_observation
-
-            # Check if task is complete
-            if consensus_action.type == "report":
-                rprint("\n[bold green]✓ Task reported as complete by agents[/bold green]")
+                # Early stopping: If all criteria are completed, encourage reporting
+                current_remaining = [c for c in success_criteria if c not in completed_criteria]
+                if len(current_remaining) == 0 and consensus_action.type != _REPORT:
+                    logger.info("All success criteria appear to be completed. Consider using 'report' action.")
+
+            except Exception as e:
+                logger.error("Execution failed: %s", e)
+                storage.log_turn_nowait(
+                    turn=turn_idx,
+                    action_type=consensus_action.type,
+                    action_target=consensus_action.target,
+                    screenshot_path=screenshot_path,
+                    agent_proposals=all_proposals,
+                    consensus_action=consensus_dump,
+                    confidence_scores=confidence_scores,
+                    success=False,
+                    latency=0.0,
+                    safety_pass=safety_pass,
+                    validators=[f"execution_error:{str(e)}"],
+                    conclusion="",
+                )
+                success = False
                 break
-            
-            # Early stopping: If all criteria are completed, encourage reporting
-            current_remaining = [c for c in success_criteria if c not in completed_criteria]
-            if len(current_remaining) == 0 and consensus_action.type != "report":
-                rprint("\n[yellow]⚠ All success criteria appear to be completed. Consider using 'report' action.[/yellow]")
-
-        except Exception as e:
-            rprint(f"\n[red]❌ Execution failed: {e}[/red]")
-            storage.log_turn(
-                turn=turn_idx,
-                action_type=consensus_action.type,
-                action_target=consensus_action.target,
-                screenshot_path=screenshot_path,
-                agent_proposals=all_proposals,
-                consensus_action=consensus_action.model_dump(),
-                confidence_scores=confidence_scores,
-                success=False,
-                latency=0.0,
-                safety_pass=safety_pass,
-                validators=[f"execution_error:{str(e)}"],
-                conclusion="",
-            )
-            success = False
-            break
-
-    # Cleanup
-    await browser.stop()
-    csv_path = storage.end_session()
+    finally:
+        try:
+            if browser is not None:
+                await _BROWSER_POOL.release(browser)
+        finally:
+            # Cleanup: write out queued turns and stop the writer even if the session failed
+            await storage.flush()
+            log_task.cancel()
+            csv_path = storage.end_session()
 
     # Final summary
     status = "completed" if success else "failed"
@@ -497,6 +584,6 @@ IMPORTANT: Use the "report" action with type="report" and target="task_complete"
         "success": success,
         "turns_executed": turns_executed,
         "csv_path": csv_path,
-        "persona": persona.model_dump(),
+        "persona": persona_dump,
         "scenario": scenario,
     }
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Dict, Optional
+import asyncio
+from typing import Any, Dict, Optional
 
 from config import settings
 from .agent import LLMUserAgent
@@ -10,14 +11,19 @@ from .storage import end_session, init_storage, log_event, log_turn, start_sessi
 from .validators import validate_action
 
 
-def run_session(
+async def run_session(
     persona: Persona,
     scenario: Dict[str, object],
     adapter: Optional[RESTAdapter] = None,
     agent: Optional[LLMUserAgent] = None,
 ) -> dict[str, object]:
-    """Execute a full test session for the given persona."""
+    """Execute a full test session for the given persona.
 
+    The blocking agent and adapter calls run in worker threads, so several
+    sessions can share one event loop.
+    """
+
+    persona_dump = persona.model_dump(exclude_defaults=True)
     init_storage()
     adapter = adapter or RESTAdapter()
     agent = agent or LLMUserAgent(persona)
@@ -40,7 +46,7 @@ def run_session(
         turns_executed = turn_idx
         log_event(session_id, "turn_start", {"turn": turn_idx})
 
-        action = agent.step(observation)
+        action = await asyncio.to_thread(agent.step, observation)
         passed, reasons = validate_action(action, persona)
 
         if not passed:
@@ -62,7 +68,7 @@ def run_session(
             success = False
             break
 
-        observation, latency = adapter.execute(action)
+        observation, latency = await asyncio.to_thread(adapter.execute, action)
         log_turn(
             session_id=session_id,
             turn_number=turn_idx,
@@ -83,6 +89,12 @@ def run_session(
         "status": status,
         "success": success,
         "turns_executed": turns_executed,
-        "persona": persona.model_dump(),
+        "persona": persona_dump,
         "scenario": scenario,
     }
+
+
+def run_session_sync(*args: Any, **kwargs: Any) -> dict[str, object]:
+    """Blocking wrapper around run_session() for synchronous callers."""
+
+    return asyncio.run(run_session(*args, **kwargs))
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Literal, Optional
+from typing import Any, Dict, List, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 class Persona(BaseModel):
@@ -16,4 +16,9 @@ class Persona(BaseModel):
 class Action(BaseModel):
     type: Literal["tap", "type", "scroll", "navigate", "upload", "report", "click", "fill"]
     target: str
-    payload: Optional[Dict[str, Any]] = None
+    payload: Dict[str, Any] = Field(default_factory=dict)
+
+    @field_validator("payload", mode="before")
+    @classmethod
+    def _payload_none_to_empty(cls, value: Any) -> Any:
+        return {} if value is None else value
@@ -1,34 +1,133 @@
-"""Simplified CSV storage for test sessions."""
+"""Simplified CSV/JSONL storage for test sessions."""
 from __future__ import annotations
 
+import asyncio
 import csv
+import hashlib
 import json
-from datetime import datetime
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import IO, Any, Dict, List, Literal, Optional
 from uuid import uuid4
 
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode("utf-8")
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    _dumps = json.dumps
+
+# Fixed CSV schema; column order matches the row tuples written by log_turn
+_FIELDS = (
+    "session_id",
+    "turn",
+    "timestamp",
+    "action_type",
+    "action_target",
+    "screenshot_path",
+    "agent_proposals",
+    "consensus_action",
+    "confidence_scores",
+    "success",
+    "latency",
+    "safety_pass",
+    "validators",
+    "persona_name",
+    "persona_goals",
+    "scenario_name",
+    "scenario_description",
+    "test_objective",
+    "conclusion",
+    "page_state",
+    "issues_found",
+    "issues_description",
+)
+
+# Characters replaced when deriving test folder/file names
+_NAME_TABLE = str.maketrans({" ": "_"})
+
+# Per-session constants; written once to session_metadata.json and only
+# repeated in every CSV row when the storage is created with wide=True
+_METADATA_FIELDS = (
+    "persona_name",
+    "persona_goals",
+    "scenario_name",
+    "scenario_description",
+    "test_objective",
+)
+
 
 class SessionStorage:
-    """Handles CSV storage for test sessions."""
+    """Handles CSV (or JSONL) storage for test sessions."""
 
-    def __init__(self, base_results_dir: str = "results"):
+    def __init__(
+        self,
+        base_results_dir: str = "results",
+        wide: bool = False,
+        format: Optional[Literal["csv", "jsonl"]] = None,
+        dedupe_proposals: Optional[bool] = None,
+    ):
+        """
+        Args:
+            base_results_dir: Directory under which per-test folders are created
+            wide: Repeat persona/scenario metadata columns in every CSV row
+            format: "csv" or "jsonl" (one JSON object per turn, nested fields
+                kept as JSON); defaults to settings.session_format
+            dedupe_proposals: Store agent_proposals/consensus_action once in
+                proposals.jsonl and write only their hash in each row;
+                defaults to settings.session_dedupe_proposals
+        """
         self.base_results_dir = Path(base_results_dir)
+        self.wide = wide
+        self.format = format or settings.session_format
+        if self.format not in ("csv", "jsonl"):
+            raise ValueError(f"Unsupported session format: {self.format}")
+        self._fields = _FIELDS if wide else tuple(f for f in _FIELDS if f not in _METADATA_FIELDS)
         self.test_folder: Optional[Path] = None
+        self._screenshots_dir: Optional[Path] = None  # Created on first request
         self.current_session_id: str | None = None
-        self.current_rows: List[Dict[str, Any]] = []
+        self.csv_path: Optional[Path] = None  # Session output file (.csv or .jsonl)
+        self._fh: Optional[IO[str]] = None
+        self._writer: Any = None  # csv.writer over self._fh
+        self._metadata_row: tuple = ()
+        self.dedupe_proposals = (
+            settings.session_dedupe_proposals if dedupe_proposals is None else dedupe_proposals
+        )
+        self._proposals_fh: Optional[IO[str]] = None
+        self._seen: set[str] = set()  # Hashes already written to proposals.jsonl
+        # Turn records are formatted and written by a writer thread, up to
+        # session_batch_size rows per write
+        self._batch_size = max(1, settings.session_batch_size)
+        self._rows: Optional[queue.Queue[Optional[tuple]]] = None
+        self._writer_thread: Optional[threading.Thread] = None
+        self._writer_error: Optional[BaseException] = None  # First failure in the writer thread
         # Store persona and scenario metadata
         self.persona_name: str = ""
         self.persona_goals: List[str] = []
         self.scenario_name: str = ""
         self.scenario_description: str = ""
         self.test_objective: str = ""
+        self._persona_goals_json: str = "[]"
+        self._test_name: str = "_"
+        # Wall-clock/monotonic anchors; rows carry a monotonic offset that the
+        # writer thread turns into an ISO timestamp
+        self._t0 = datetime.now()
+        self._t0_mono = time.monotonic()
+        # Pending log_turn records, written by the drain() consumer task
+        self._queue: asyncio.Queue[Dict[str, Any]] = asyncio.Queue()
 
     def _generate_test_name(self) -> str:
-        """Generate test folder/file name from persona and scenario names."""
-        persona = self.persona_name.lower().replace(" ", "_")
-        scenario = self.scenario_name.lower().replace(" ", "_")
-        return f"{persona}_{scenario}"
+        """Return the test folder/file name cached by start_session()."""
+        return self._test_name
 
     def start_session(self, persona: Any = None, scenario: Dict[str, Any] = None) -> str:
         """Start a new session and return session ID.
@@ -37,10 +136,11 @@ class SessionStorage:
             persona: Persona object with name and goals attributes
             scenario: Scenario dict with name, description, and test_objective keys
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._t0 = datetime.now()
+        self._t0_mono = time.monotonic()
+        timestamp = self._t0.strftime("%Y%m%d_%H%M%S")
         unique_id = str(uuid4())[:8]
         self.current_session_id = f"{timestamp}_{unique_id}"
-        self.current_rows = []
         
         # Store metadata for use in all log_turn calls
         if persona:
@@ -51,11 +151,53 @@ class SessionStorage:
             self.scenario_name = scenario.get("name", "Unknown")
             self.scenario_description = scenario.get("description", "")
             self.test_objective = scenario.get("test_objective", "")
+        self._persona_goals_json = json.dumps(self.persona_goals)
+        self._test_name = (
+            f"{self.persona_name.lower().translate(_NAME_TABLE)}_"
+            f"{self.scenario_name.lower().translate(_NAME_TABLE)}"
+        )
+        self._metadata_row = (
+            (
+                self.persona_name,
+                self._persona_goals_json,
+                self.scenario_name,
+                self.scenario_description,
+                self.test_objective,
+            )
+            if self.wide
+            else ()
+        )
         
         # Create test-specific folder
         test_name = self._generate_test_name()
         self.test_folder = self.base_results_dir / test_name
+        self._screenshots_dir = None
         self.test_folder.mkdir(parents=True, exist_ok=True)
+
+        metadata = {
+            "session_id": self.current_session_id,
+            "persona_name": self.persona_name,
+            "persona_goals": self.persona_goals,
+            "scenario_name": self.scenario_name,
+            "scenario_description": self.scenario_description,
+            "test_objective": self.test_objective,
+        }
+        with open(self.test_folder / "session_metadata.json", "w", encoding="utf-8") as f:
+            json.dump(metadata, f, indent=2)
+
+        # Stream rows to the output file as they are logged
+        self.csv_path = self.test_folder / f"{test_name}.{self.format}"
+        self._fh = open(self.csv_path, "w", newline="", encoding="utf-8", buffering=1 << 20)
+        if self.format == "csv":
+            self._writer = csv.writer(self._fh)
+            self._writer.writerow(self._fields)
+        if self.dedupe_proposals:
+            self._proposals_fh = open(self.test_folder / "proposals.jsonl", "w", encoding="utf-8", buffering=1 << 16)
+            self._seen = set()
+        self._rows = queue.Queue(maxsize=1024)
+        self._writer_error = None
+        self._writer_thread = threading.Thread(target=self._write_rows, name="session-csv-writer", daemon=True)
+        self._writer_thread.start()
         
         return self.current_session_id
 
@@ -76,6 +218,7 @@ class SessionStorage:
         page_state: str = "",
         issues_found: str = "",
         issues_description: str = "",
+        ts_offset: float | None = None,
     ) -> None:
         """Log a single turn to the session.
         
@@ -84,67 +227,234 @@ class SessionStorage:
             page_state: Optional snapshot of the page/app state after the action
             issues_found: Optional string describing issues discovered on this turn
             issues_description: Optional detailed description of issues found on this turn
+            ts_offset: Seconds since session start when the turn happened (defaults to now)
         """
         if not self.current_session_id:
             raise RuntimeError("No active session. Call start_session() first.")
 
+        self._rows.put((
+            turn,
+            time.monotonic() - self._t0_mono if ts_offset is None else ts_offset,
+            action_type,
+            action_target,
+            screenshot_path,
+            agent_proposals,
+            consensus_action,
+            confidence_scores,
+            success,
+            latency,
+            safety_pass,
+            validators,
+            conclusion,
+            page_state,
+            issues_found,
+            issues_description,
+        ))
+
+    def _intern(self, obj: Any) -> str:
+        """Write obj to proposals.jsonl once and return its 16-hex-char key."""
+        blob = _dumps(obj)
+        key = hashlib.blake2b(blob.encode("utf-8"), digest_size=8).hexdigest()
+        if key not in self._seen:
+            self._seen.add(key)
+            self._proposals_fh.write(f"{key}\t{blob}\n")
+        return key
+
+    def _format_row(self, record: tuple) -> tuple:
+        """Turn a queued log_turn record into a CSV row in _FIELDS order."""
+        (
+            turn, ts_offset, action_type, action_target, screenshot_path,
+            agent_proposals, consensus_action, confidence_scores,
+            success, latency, safety_pass, validators,
+            conclusion, page_state, issues_found, issues_description,
+        ) = record
+        return (
+            self.current_session_id,
+            turn,
+            (self._t0 + timedelta(seconds=ts_offset)).isoformat(),
+            action_type,
+            action_target,
+            screenshot_path,
+            *(
+                (self._intern(agent_proposals), self._intern(consensus_action))
+                if self.dedupe_proposals
+                else (_dumps(agent_proposals), _dumps(consensus_action))
+            ),
+            _dumps(confidence_scores),
+            success,
+            round(latency, 3),
+            safety_pass,
+            ";".join(validators) if validators else "",
+            *self._metadata_row,
+            conclusion,
+            page_state,
+            issues_found,
+            issues_description,
+        )
+
+    def _format_json_line(self, record: tuple) -> str:
+        """Turn a queued log_turn record into a JSONL line keyed by _FIELDS."""
+        (
+            turn, ts_offset, action_type, action_target, screenshot_path,
+            agent_proposals, consensus_action, confidence_scores,
+            success, latency, safety_pass, validators,
+            conclusion, page_state, issues_found, issues_description,
+        ) = record
+        if self.dedupe_proposals:
+            agent_proposals = self._intern(agent_proposals)
+            consensus_action = self._intern(consensus_action)
         row = {
             "session_id": self.current_session_id,
             "turn": turn,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": (self._t0 + timedelta(seconds=ts_offset)).isoformat(),
             "action_type": action_type,
             "action_target": action_target,
             "screenshot_path": screenshot_path,
-            "agent_proposals": json.dumps(agent_proposals),
-            "consensus_action": json.dumps(consensus_action),
-            "confidence_scores": json.dumps(confidence_scores),
+            "agent_proposals": agent_proposals,
+            "consensus_action": consensus_action,
+            "confidence_scores": confidence_scores,
             "success": success,
             "latency": round(latency, 3),
             "safety_pass": safety_pass,
-            "validators": ";".join(validators) if validators else "",
-            # Metadata columns (duplicated in every row)
-            "persona_name": self.persona_name,
-            "persona_goals": json.dumps(self.persona_goals),
-            "scenario_name": self.scenario_name,
-            "scenario_description": self.scenario_description,
-            "test_objective": self.test_objective,
+            "validators": validators or [],
             "conclusion": conclusion,
             "page_state": page_state,
             "issues_found": issues_found,
             "issues_description": issues_description,
         }
-        self.current_rows.append(row)
+        if self.wide:
+            row.update(
+                persona_name=self.persona_name,
+                persona_goals=self.persona_goals,
+                scenario_name=self.scenario_name,
+                scenario_description=self.scenario_description,
+                test_objective=self.test_objective,
+            )
+        return _dumps(row) + "\n"
+
+    def _write_rows(self) -> None:
+        """Writer thread: format and write queued records until the None sentinel.
+
+        The first exception is kept for end_session() to re-raise; later
+        records are still consumed (and discarded) so log_turn never blocks
+        on a full queue.
+        """
+        rows_q = self._rows
+        jsonl = self.format == "jsonl"
+        format_row = self._format_json_line if jsonl else self._format_row
+        done = False
+        while not done:
+            record = rows_q.get()
+            if record is None:
+                break
+            records = [record]
+            while len(records) < self._batch_size:
+                try:
+                    record = rows_q.get_nowait()
+                except queue.Empty:
+                    break
+                if record is None:
+                    done = True
+                    break
+                records.append(record)
+            if self._writer_error is not None:
+                continue
+            try:
+                rows = [format_row(r) for r in records]
+                if jsonl:
+                    self._fh.write("".join(rows))
+                else:
+                    self._writer.writerows(rows)
+            except Exception as exc:
+                self._writer_error = exc
+
+    def log_turn_nowait(self, **record: Any) -> None:
+        """Queue a turn for logging without blocking the caller.
+
+        Accepts the same keyword arguments as log_turn(); the turn time is
+        captured now and the record is written by the drain() task in
+        submission order.
+        """
+        if not self.current_session_id:
+            raise RuntimeError("No active session. Call start_session() first.")
+        record.setdefault("ts_offset", time.monotonic() - self._t0_mono)
+        self._queue.put_nowait(record)
+
+    async def drain(self) -> None:
+        """Consume queued turn records until cancelled.
+
+        log_turn blocks while the writer queue is full, so it runs off the
+        event loop; a record that fails is logged and dropped so the task
+        keeps draining and flush() still returns.
+        """
+        while True:
+            record = await self._queue.get()
+            try:
+                await asyncio.to_thread(self.log_turn, **record)
+            except Exception:
+                logger.exception("Failed to log turn %s", record.get("turn"))
+            finally:
+                self._queue.task_done()
+
+    async def flush(self) -> None:
+        """Wait until every queued turn record has been written."""
+        await self._queue.join()
 
     def end_session(self) -> str:
-        """End the session and write CSV file. Returns path to CSV."""
+        """End the session and close the output file. Returns its path.
+
+        Re-raises the writer thread's error, if any, after closing the files.
+        """
         if not self.current_session_id:
             raise RuntimeError("No active session to end.")
         
         if not self.test_folder:
             raise RuntimeError("Test folder not initialized.")
 
-        # Save CSV in the test folder with test name
-        test_name = self._generate_test_name()
-        csv_path = self.test_folder / f"{test_name}.csv"
-
-        # Write CSV
-        with open(csv_path, "w", newline="", encoding="utf-8") as f:
-            if self.current_rows:
-                fieldnames = list(self.current_rows[0].keys())
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(self.current_rows)
+        self._rows.put(None)
+        self._writer_thread.join()
+        self._fh.flush()
+        self._fh.close()
+        if self._proposals_fh:
+            self._proposals_fh.close()
+        csv_path = self.csv_path
 
         # Reset
         self.current_session_id = None
-        self.current_rows = []
+        self._fh = None
+        self._writer = None
+        self._rows = None
+        self._writer_thread = None
+        self._screenshots_dir = None
+        self._proposals_fh = None
+        self._seen = set()
 
+        error, self._writer_error = self._writer_error, None
+        if error is not None:
+            raise error
         return str(csv_path)
     
     def get_screenshots_dir(self) -> str:
         """Get the screenshots directory for this test."""
+        if self._screenshots_dir:
+            return str(self._screenshots_dir)
         if not self.test_folder:
             raise RuntimeError("Test folder not initialized.")
         screenshots_dir = self.test_folder / "screenshots"
         screenshots_dir.mkdir(parents=True, exist_ok=True)
+        self._screenshots_dir = screenshots_dir
         return str(screenshots_dir)
+
+
+def load_proposals(test_folder: str | Path) -> Dict[str, Any]:
+    """Read a session's proposals.jsonl into a {hash: decoded JSON} mapping.
+
+    Used to resolve the agent_proposals/consensus_action keys written when
+    SessionStorage runs with dedupe_proposals enabled.
+    """
+    table: Dict[str, Any] = {}
+    with open(Path(test_folder) / "proposals.jsonl", encoding="utf-8") as f:
+        for line in f:
+            key, _, blob = line.rstrip("\n").partition("\t")
+            table[key] = json.loads(blob)
+    return table
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
 import re
-from typing import Dict, List, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from .schemas import Action, Persona
 
+try:  # Optional: multi-pattern DFA scanning (pip install hyperscan)
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
 VALID_TYPES = {"tap", "type", "scroll", "navigate", "upload", "report", "click", "fill"}
 
 # Safety patterns for adversarial testing
@@ -58,68 +63,195 @@ STOCK_MANIPULATION_PATTERNS = [
 ]
 
 
+# Every safety pattern needs at least one of these characters to match: the
+# punctuation used by the patterns plus everything `\s` matches (str.isspace;
+# all Unicode whitespace lies below U+3001). Texts without any are skipped.
+_TRIGGER_CHARS = frozenset("'\";<>|&`$./\\=:-").union(
+    c for c in map(chr, range(0x3001)) if c.isspace()
+)
+
+
+def _compile_union(patterns: List[str]) -> re.Pattern[str]:
+    """Join a category's patterns into one alternation; group `p{i}` is patterns[i]."""
+    return re.compile("|".join(f"(?P<p{i}>{p})" for i, p in enumerate(patterns)), re.IGNORECASE)
+
+
+def _compile_bytes(pattern: str) -> re.Pattern[bytes]:
+    """Bytes twin of a str pattern for scanning ASCII texts.
+
+    The str whitespace class also matches the ASCII separators 0x1c-0x1f,
+    which the bytes class does not; it is widened so both forms agree on
+    every ASCII input.
+    """
+    return re.compile(pattern.replace(r"\s", r"[\s\x1c-\x1f]").encode(), re.IGNORECASE | re.ASCII)
+
+
+def _compile_union_bytes(patterns: List[str]) -> re.Pattern[bytes]:
+    """Bytes twin of _compile_union for scanning ASCII texts."""
+    return _compile_bytes("|".join(f"(?P<p{i}>{p})" for i, p in enumerate(patterns)))
+
+
+# (category, union regex, original patterns) for every safety category
+CATEGORIES: List[Tuple[str, re.Pattern[str], List[str]]] = [
+    (category, _compile_union(patterns), patterns)
+    for category, patterns in (
+        ("sql_injection", SQL_INJECTION_PATTERNS),
+        ("xss", XSS_PATTERNS),
+        ("command_injection", COMMAND_INJECTION_PATTERNS),
+        ("path_traversal", PATH_TRAVERSAL_PATTERNS),
+        ("price_manipulation", PRICE_MANIPULATION_PATTERNS),
+        ("quantity_manipulation", QUANTITY_MANIPULATION_PATTERNS),
+        ("stock_manipulation", STOCK_MANIPULATION_PATTERNS),
+    )
+]
+
+
+# Bytes unions, parallel to CATEGORIES; used for ASCII texts, which skips
+# Unicode case folding (non-ASCII texts keep the str regexes)
+_BYTES_UNIONS: List[re.Pattern[bytes]] = [_compile_union_bytes(patterns) for _, _, patterns in CATEGORIES]
+
+# Per-pattern regexes, parallel to CATEGORIES, in list order
+_STR_PATTERNS: List[List[re.Pattern[str]]] = [
+    [re.compile(p, re.IGNORECASE) for p in patterns] for _, _, patterns in CATEGORIES
+]
+_BYTES_PATTERNS: List[List[re.Pattern[bytes]]] = [
+    [_compile_bytes(p) for p in patterns] for _, _, patterns in CATEGORIES
+]
+
+
+def _first_match(data: str | bytes, union: re.Pattern, regexes: List[re.Pattern],
+                 patterns: List[str]) -> Optional[str]:
+    """Return the first pattern in list order that matches `data`, if any.
+
+    The union only answers "does anything match?": its match is the
+    leftmost in the text, not the first in the list, so on a hit the
+    patterns are re-checked in order to report the same rule as a
+    per-pattern scan.
+    """
+    if not union.search(data):
+        return None
+    for pattern, regex in zip(patterns, regexes):
+        if regex.search(data):
+            return pattern
+    return None
+
+
+def _scan_re(text: str) -> List[str]:
+    """Scan one text with the per-category union regexes."""
+    reasons = []
+    if text.isascii():
+        data: str | bytes = text.encode("ascii")
+        unions = _BYTES_UNIONS
+        compiled = _BYTES_PATTERNS
+    else:
+        data = text
+        unions = [regex for _, regex, _ in CATEGORIES]
+        compiled = _STR_PATTERNS
+    for (category, _, patterns), union, regexes in zip(CATEGORIES, unions, compiled):
+        pattern = _first_match(data, union, regexes, patterns)
+        if pattern is not None:
+            reasons.append(f"safety:{category}:{pattern}")
+    return reasons
+
+
+class _HyperscanScanner:
+    """All safety patterns compiled into a single Hyperscan database.
+
+    Patterns Hyperscan cannot compile (e.g. lookaheads) stay on the `re`
+    path. Both keep their index in the category's pattern list, so the
+    reported rule is the first in list order, as with _scan_re.
+    """
+
+    def __init__(self) -> None:
+        flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH
+        self.meta: List[Tuple[int, int, str]] = []  # id -> (category index, list index, pattern)
+        # category index -> [(list index, pattern, regex)] for patterns Hyperscan rejected
+        self.fallback: Dict[int, List[Tuple[int, str, re.Pattern[str]]]] = {}
+        expressions: List[bytes] = []
+        for cat_idx, (_, _, patterns) in enumerate(CATEGORIES):
+            for list_idx, pattern in enumerate(patterns):
+                try:
+                    hyperscan.Database().compile(expressions=[pattern.encode()], flags=[flags])
+                except hyperscan.error:
+                    self.fallback.setdefault(cat_idx, []).append(
+                        (list_idx, pattern, re.compile(pattern, re.IGNORECASE))
+                    )
+                    continue
+                self.meta.append((cat_idx, list_idx, pattern))
+                expressions.append(pattern.encode())
+
+        self.db = hyperscan.Database()
+        self.db.compile(
+            expressions=expressions,
+            ids=list(range(len(expressions))),
+            elements=len(expressions),
+            flags=[flags] * len(expressions),
+        )
+
+    def scan(self, text: str) -> List[str]:
+        hits: Dict[int, int] = {}  # category index -> lowest matching pattern id
+
+        def on_match(pattern_id: int, start: int, end: int, flags: int, context: object) -> None:
+            cat_idx = self.meta[pattern_id][0]
+            if pattern_id < hits.get(cat_idx, len(self.meta)):
+                hits[cat_idx] = pattern_id
+
+        self.db.scan(text.encode("utf-8"), match_event_handler=on_match)
+
+        reasons = []
+        for cat_idx, (category, _, _) in enumerate(CATEGORIES):
+            best: Optional[Tuple[int, str]] = None  # (list index, pattern)
+            if cat_idx in hits:
+                _, list_idx, pattern = self.meta[hits[cat_idx]]
+                best = (list_idx, pattern)
+            # A fallback pattern wins only if it precedes the Hyperscan hit in the list
+            for list_idx, pattern, regex in self.fallback.get(cat_idx, ()):
+                if best is not None and list_idx > best[0]:
+                    break
+                if regex.search(text):
+                    best = (list_idx, pattern)
+                    break
+            if best is not None:
+                reasons.append(f"safety:{category}:{best[1]}")
+        return reasons
+
+
+# Built at import, like the re unions above, so a bad pattern fails on load
+# rather than on the first scanned action
+_HS_SCANNER: Optional[_HyperscanScanner] = _HyperscanScanner() if hyperscan is not None else None
+
+
+def _scan_text(text: str) -> List[str]:
+    """Return safety reasons for one text, using Hyperscan when it is installed."""
+    if _TRIGGER_CHARS.isdisjoint(text):
+        return []
+    if _HS_SCANNER is None:
+        return _scan_re(text)
+    return _HS_SCANNER.scan(text)
+
+
+def _iter_strings(obj: Any) -> Iterator[str]:
+    """Yield every string in a JSON-like value, at any nesting depth."""
+    if isinstance(obj, str):
+        yield obj
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            yield from _iter_strings(value)
+    elif isinstance(obj, (list, tuple)):
+        for value in obj:
+            yield from _iter_strings(value)
+
+
 def _check_safety(action: Action) -> List[str]:
     """Check action for security vulnerabilities."""
     safety_reasons = []
 
-    # Extract all text content from the action
-    text_to_check = []
+    # Texts are scanned separately rather than joined into one blob: `\s`,
+    # `.*` and `[^>]*` can span any separator and would match across fields.
     if action.target:
-        text_to_check.append(action.target)
-
-    if action.payload:
-        for key, value in action.payload.items():
-            if isinstance(value, str):
-                text_to_check.append(value)
-            elif isinstance(value, dict):
-                # Handle nested JSON payloads
-                for nested_key, nested_value in value.items():
-                    if isinstance(nested_value, str):
-                        text_to_check.append(nested_value)
-
-    # Check each text field for security patterns
-    for text in text_to_check:
-        # SQL Injection
-        for pattern in SQL_INJECTION_PATTERNS:
-            if re.search(pattern, text, re.IGNORECASE):
-                safety_reasons.append(f"safety:sql_injection:{pattern}")
-                break
-
-        # XSS
-        for pattern in XSS_PATTERNS:
-            if re.search(pattern, text, re.IGNORECASE):
-                safety_reasons.append(f"safety:xss:{pattern}")
-                break
-
-        # Command Injection
-        for pattern in COMMAND_INJECTION_PATTERNS:
-            if re.search(pattern, text, re.IGNORECASE):
-                safety_reasons.append(f"safety:command_injection:{pattern}")
-                break
-
-        # Path Traversal
-        for pattern in PATH_TRAVERSAL_PATTERNS:
-            if re.search(pattern, text, re.IGNORECASE):
-                safety_reasons.append(f"safety:path_traversal:{pattern}")
-                break
-
-        # Price Manipulation
-        for pattern in PRICE_MANIPULATION_PATTERNS:
-            if re.search(pattern, text, re.IGNORECASE):
-                safety_reasons.append(f"safety:price_manipulation:{pattern}")
-                break
-
-        # Quantity Manipulation
-        for pattern in QUANTITY_MANIPULATION_PATTERNS:
-            if re.search(pattern, text, re.IGNORECASE):
-                safety_reasons.append(f"safety:quantity_manipulation:{pattern}")
-                break
-
-        # Stock Manipulation
-        for pattern in STOCK_MANIPULATION_PATTERNS:
-            if re.search(pattern, text, re.IGNORECASE):
-                safety_reasons.append(f"safety:stock_manipulation:{pattern}")
-                break
+        safety_reasons.extend(_scan_text(action.target))
+    for text in _iter_strings(action.payload):
+        safety_reasons.extend(_scan_text(text))
 
     return safety_reasons
 
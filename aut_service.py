@@ -3,38 +3,242 @@ Full-Featured E-commerce REST API for LLM Beta Testing.
 
 Run with:
     uvicorn aut_service:app --reload --port 8000
+
+or, for load testing (uvloop + httptools, no access log):
+    python aut_service.py
 """
 
 from __future__ import annotations
 
+import asyncio
+import gzip
+import hashlib
+import os
+import sqlite3
+import time
+from bisect import bisect_left, bisect_right
+from contextlib import AsyncExitStack
 from datetime import datetime, timedelta
+from functools import lru_cache
+from operator import itemgetter, neg
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
 from uuid import uuid4
 
-from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import HTMLResponse, Response
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
+from pydantic_core import to_json
+
+try:
+    from orjson import dumps as _json_dumps
+except ImportError:  # orjson is optional; pydantic-core's Rust encoder ships with pydantic
+    _json_dumps = to_json
+
+
+class ORJSONResp(Response):
+    """JSON response serialized by orjson (or pydantic-core), skipping jsonable_encoder when returned directly."""
+
+    media_type = "application/json"
 
-app = FastAPI(title="Scamazon E-Commerce API", version="2.0.0")
+    def render(self, content: Any) -> bytes:
+        return _json_dumps(content)
+
+app = FastAPI(title="Scamazon E-Commerce API", version="2.0.0", default_response_class=ORJSONResp)
+
+_BASE_DIR = Path(__file__).resolve().parent
+_TEMPLATES_DIR = _BASE_DIR / "templates"
 
 # Mount static files
-static_dir = Path(__file__).parent / "static"
+static_dir = _BASE_DIR / "static"
 if static_dir.exists():
     app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
 
 # Mount images directory
-images_dir = Path(__file__).parent / "images"
+images_dir = _BASE_DIR / "images"
 if images_dir.exists():
     app.mount("/images", StaticFiles(directory=str(images_dir)), name="images")
 
 # In-memory storage
 _PRODUCTS: List[Dict] = []
-_CARTS: Dict[str, List[Dict]] = {}  # session_id -> list of cart items
-_ORDERS: List[Dict] = []
+_PRODUCTS_BY_ID: Dict[str, Dict] = {}  # product_id -> product, kept in step with _PRODUCTS
+_CARTS: Dict[str, Dict[str, int]] = {}  # session_id -> product_id -> quantity
+# session_id -> product_id -> epoch seconds the line was added; only read when an order is created
+_CART_ADDED_AT: Dict[str, Dict[str, float]] = {}
+_CART_LOCKS: Dict[str, asyncio.Lock] = {}  # session_id -> lock held while mutating that cart
+_CART_TOUCHED: Dict[str, float] = {}  # session_id -> monotonic time of the last cart mutation
+_CART_TTL = 3600.0  # seconds a cart may go unmodified before it is dropped
+_CART_SWEEP_INTERVAL = 60.0
+_next_cart_sweep = 0.0
+_CATALOG_LOCK = asyncio.Lock()  # held while _PRODUCTS and its indexes are updated
+_DB_PATH = Path(os.environ.get("AUT_DB", _BASE_DIR / "aut.db"))
+_DB_WRITE_LOCK = asyncio.Lock()  # SQLite allows one writer; serialize inserts on it
+_ORDERS_HISTORY_LIMIT = 100
 _REVIEWS: Dict[str, List[Dict]] = {}  # product_id -> list of reviews
+_REVIEW_AGG: Dict[str, List[int]] = {}  # product_id -> [count, rating_sum]
+_REVIEWS_JSON: Dict[str, bytes] = {}  # product_id -> unpaginated get_reviews body; dropped by add_review
+_REVIEW_BUFFER: List[Tuple[str, int, str, str, str, str]] = []  # review rows not yet written to _DB_PATH
+_REVIEW_FLUSH_INTERVAL = 0.5
+_review_flush_task: Optional[asyncio.Task] = None
 _USERS: Dict[str, Dict] = {}  # email -> user data
+_last_iso: Tuple[int, str] = (-1, "")  # (monotonic millisecond, wall-clock ISO string) from _now_iso
+
+
+def _open_db() -> Tuple[sqlite3.Connection, sqlite3.Connection]:
+    """Open the AUT database, returning (writer, reader) connections.
+
+    WAL lets the reader see committed rows while an insert is in flight.
+    Each order is kept whole as its JSON encoding in ``payload``; reviews
+    are stored column by column as a write-only log. The reviews table is
+    emptied on open so every AUT process starts from the seeded catalog
+    reviews, keeping experiment runs comparable.
+    """
+    writer = sqlite3.connect(_DB_PATH, check_same_thread=False)
+    writer.execute("PRAGMA journal_mode=WAL")
+    writer.execute("PRAGMA synchronous=NORMAL")
+    writer.execute("PRAGMA busy_timeout=5000")
+    writer.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS orders (
+            id TEXT PRIMARY KEY,
+            session_id TEXT NOT NULL,
+            total REAL NOT NULL,
+            status TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            payload BLOB NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS ix_orders_session ON orders (session_id, created_at);
+        CREATE TABLE IF NOT EXISTS reviews (
+            product_id TEXT NOT NULL,
+            rating INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            comment TEXT NOT NULL,
+            reviewer_name TEXT NOT NULL,
+            date TEXT NOT NULL
+        );
+        DELETE FROM reviews;
+        """
+    )
+    reader = sqlite3.connect(_DB_PATH, check_same_thread=False)
+    reader.execute("PRAGMA busy_timeout=5000")
+    return writer, reader
+
+
+_DB_WRITER, _DB_READER = _open_db()
+
+
+async def _flush_reviews() -> None:
+    """Write buffered reviews with one executemany per interval."""
+    while True:
+        await asyncio.sleep(_REVIEW_FLUSH_INTERVAL)
+        if not _REVIEW_BUFFER:
+            continue
+        rows = _REVIEW_BUFFER[:]
+        del _REVIEW_BUFFER[:len(rows)]
+        async with _DB_WRITE_LOCK:
+            with _DB_WRITER:
+                _DB_WRITER.executemany("INSERT INTO reviews VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+
+def _now_iso() -> str:
+    """Return ``datetime.now().isoformat()``, reformatted at most once per millisecond."""
+    global _last_iso
+    tick = time.monotonic_ns() // 1_000_000
+    if tick != _last_iso[0]:
+        _last_iso = (tick, datetime.now().isoformat())
+    return _last_iso[1]
+
+
+def _expire_idle_carts(now: float) -> None:
+    """Drop carts (and their locks) not modified within _CART_TTL."""
+    global _next_cart_sweep
+    _next_cart_sweep = now + _CART_SWEEP_INTERVAL
+    cutoff = now - _CART_TTL
+    for session_id in [sid for sid, touched in _CART_TOUCHED.items() if touched < cutoff]:
+        lock = _CART_LOCKS.get(session_id)
+        if lock is not None and lock.locked():
+            continue
+        del _CART_TOUCHED[session_id]
+        _CARTS.pop(session_id, None)
+        _CART_ADDED_AT.pop(session_id, None)
+        _CART_LOCKS.pop(session_id, None)
+
+
+def _cart_lock(session_id: str) -> asyncio.Lock:
+    """Return the lock serializing mutations of one session's cart.
+
+    Every cart mutation goes through here, so it also refreshes the cart's
+    idle timer and periodically sweeps expired carts.
+    """
+    now = time.monotonic()
+    _CART_TOUCHED[session_id] = now
+    if now >= _next_cart_sweep:
+        _expire_idle_carts(now)
+    lock = _CART_LOCKS.get(session_id)
+    if lock is None:
+        lock = _CART_LOCKS[session_id] = asyncio.Lock()
+    return lock
+
+
+# Catalog indexes, rebuilt by _index_catalog() whenever _PRODUCTS changes
+_KEY_PRICE = itemgetter("price")
+_KEY_NAME = itemgetter("name")
+_KEY_RATING = itemgetter("rating")  # _index_catalog() defaults missing ratings to 0
+_SORT_KEYS = {
+    "price_asc": (_KEY_PRICE, False),
+    "price_desc": (_KEY_PRICE, True),
+    "name": (_KEY_NAME, False),
+    "rating": (_KEY_RATING, True),
+}
+
+
+class _CatalogView(NamedTuple):
+    """Products in one order, with the filtered fields as parallel columns."""
+
+    products: Tuple[Dict, ...]
+    prices: Tuple[float, ...]
+    categories: Tuple[str, ...]  # lowercased
+    names: Tuple[str, ...]  # lowercased, for search
+    descriptions: Tuple[str, ...]  # lowercased, for search
+
+
+def _build_view(products: List[Dict]) -> _CatalogView:
+    return _CatalogView(
+        tuple(products),
+        tuple(p["price"] for p in products),
+        tuple(p.get("category", "").lower() for p in products),
+        tuple(p.get("name", "").lower() for p in products),
+        tuple(p.get("description", "").lower() for p in products),
+    )
+
+
+# Sort name -> view in that order; "" is catalog order (unknown sort values)
+_VIEWS: Dict[str, _CatalogView] = {}
+# Full catalog JSON served by /api/catalog, and its ETag
+_CATALOG_BYTES = b"[]"
+_CATALOG_ETAG = ""
+
+# HTML pages, read once at import; None when the template file is missing.
+# Restart the server to pick up template edits.
+def _load_page(name: str) -> Optional[HTMLResponse]:
+    path = _TEMPLATES_DIR / f"{name}.html"
+    return HTMLResponse(path.read_bytes()) if path.exists() else None
+
+
+_PAGES: Dict[str, Optional[HTMLResponse]] = {
+    name: _load_page(name)
+    for name in (
+        "index",
+        "products",
+        "product-detail",
+        "cart",
+        "checkout",
+        "account",
+        "search",
+        "order-confirmation",
+    )
+}
 
 # Pydantic models
 class Product(BaseModel):
@@ -69,6 +273,23 @@ class UserLogin(BaseModel):
     password: str
 
 
+def _index_catalog():
+    """Rebuild the id index, presorted views, catalog snapshot and response caches over _PRODUCTS."""
+    global _CATALOG_BYTES, _CATALOG_ETAG
+    for p in _PRODUCTS:
+        p.setdefault("rating", 0)
+    _PRODUCTS_BY_ID.clear()
+    _PRODUCTS_BY_ID.update((p["id"], p) for p in _PRODUCTS)
+    _VIEWS[""] = _build_view(_PRODUCTS)
+    for sort, (key, reverse) in _SORT_KEYS.items():
+        _VIEWS[sort] = _build_view(sorted(_PRODUCTS, key=key, reverse=reverse))
+    _CATALOG_BYTES = ORJSONResp(_PRODUCTS).body
+    _CATALOG_ETAG = f'"{hashlib.sha256(_CATALOG_BYTES).hexdigest()[:16]}"'
+    _products_page.cache_clear()
+    _products_page_gzip.cache_clear()
+    _product_json.cache_clear()
+
+
 # Initialize comprehensive product catalog
 def _init_product_catalog():
     global _PRODUCTS, _REVIEWS
@@ -485,91 +706,94 @@ def _init_product_catalog():
         ]
         
         _PRODUCTS.extend(products)
+        _index_catalog()
         
         # Initialize some sample reviews
         _REVIEWS["prod_1"] = [
             {"rating": 5, "title": "Amazing sound quality!", "comment": "Best headphones I've ever owned.", "reviewer_name": "John D.", "date": "2024-01-15"},
             {"rating": 4, "title": "Great, but pricey", "comment": "Excellent product but a bit expensive.", "reviewer_name": "Sarah M.", "date": "2024-01-10"}
         ]
+        _REVIEW_AGG["prod_1"] = [2, 9]
 
 
 # API Endpoints
 
 @app.get("/", response_class=HTMLResponse)
-def serve_homepage():
+async def serve_homepage():
     """Serve the e-commerce homepage."""
-    html_path = Path(__file__).parent / "templates" / "index.html"
-    if html_path.exists():
-        return html_path.read_text()
+    page = _PAGES["index"]
+    if page is not None:
+        return page
     return "<h1>Scamazon</h1><p>Homepage template not found</p>"
 
 
 @app.get("/products", response_class=HTMLResponse)
-def serve_products_page(sort: str = Query(None)):
+async def serve_products_page(sort: str = Query(None)):
     """Serve the products listing page."""
-    html_path = Path(__file__).parent / "templates" / "products.html"
-    if html_path.exists():
-        return html_path.read_text()
+    page = _PAGES["products"]
+    if page is not None:
+        return page
     return "<h1>Products</h1><p>Products page template not found</p>"
 
 
 @app.get("/product/{product_id}", response_class=HTMLResponse)
-def serve_product_detail(product_id: str):
+async def serve_product_detail(product_id: str):
     """Serve the product detail page."""
-    html_path = Path(__file__).parent / "templates" / "product-detail.html"
-    if html_path.exists():
-        return html_path.read_text()
+    page = _PAGES["product-detail"]
+    if page is not None:
+        return page
     return f"<h1>Product {product_id}</h1><p>Product detail template not found</p>"
 
 
 @app.get("/cart", response_class=HTMLResponse)
-def serve_cart_page():
+async def serve_cart_page():
     """Serve the shopping cart page."""
-    html_path = Path(__file__).parent / "templates" / "cart.html"
-    if html_path.exists():
-        return html_path.read_text()
+    page = _PAGES["cart"]
+    if page is not None:
+        return page
     return "<h1>Cart</h1><p>Cart page template not found</p>"
 
 
 @app.get("/checkout", response_class=HTMLResponse)
-def serve_checkout_page():
+async def serve_checkout_page():
     """Serve the checkout page."""
-    html_path = Path(__file__).parent / "templates" / "checkout.html"
-    if html_path.exists():
-        return html_path.read_text()
+    page = _PAGES["checkout"]
+    if page is not None:
+        return page
     return "<h1>Checkout</h1><p>Checkout page template not found</p>"
 
 
 @app.get("/account", response_class=HTMLResponse)
-def serve_account_page():
+async def serve_account_page():
     """Serve the account page."""
-    html_path = Path(__file__).parent / "templates" / "account.html"
-    if html_path.exists():
-        return html_path.read_text()
+    page = _PAGES["account"]
+    if page is not None:
+        return page
     return "<h1>Account</h1><p>Account page template not found</p>"
 
 
 @app.get("/search", response_class=HTMLResponse)
-def serve_search_page(q: str = Query(None)):
+async def serve_search_page(q: str = Query(None)):
     """Serve the search results page."""
-    html_path = Path(__file__).parent / "templates" / "search.html"
-    if html_path.exists():
-        return html_path.read_text()
+    page = _PAGES["search"]
+    if page is not None:
+        return page
     return f"<h1>Search Results for: {q}</h1><p>Search page template not found</p>"
 
 
 @app.get("/order-confirmation", response_class=HTMLResponse)
-def serve_order_confirmation():
+async def serve_order_confirmation():
     """Serve the order confirmation page."""
-    html_path = Path(__file__).parent / "templates" / "order-confirmation.html"
-    if html_path.exists():
-        return html_path.read_text()
+    page = _PAGES["order-confirmation"]
+    if page is not None:
+        return page
     return "<h1>Order Confirmation</h1><p>Order confirmation template not found</p>"
 
 
 # API Endpoints
 @app.get("/api/products")
-def get_products(
+async def get_products(
+    request: Request,
     category: Optional[str] = None,
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
@@ -579,28 +803,37 @@ def get_products(
     limit: int = 12
 ):
     """Get all products with optional filtering and pagination."""
-    _init_product_catalog()
-    
-    filtered = _PRODUCTS.copy()
-    
-    # Apply filters
-    if category:
-        filtered = [p for p in filtered if p.get("category", "").lower() == category.lower()]
+    if not q:
+        # Plain listings are deterministic, so their bodies are cached pre-serialized
+        key = (category, min_price, max_price, sort, page, limit)
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            return Response(
+                _products_page_gzip(*key),
+                media_type="application/json",
+                headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+            )
+        return Response(_products_page(*key), media_type="application/json", headers={"Vary": "Accept-Encoding"})
+    else:
+        # Search over the catalog-order view; its text columns are lowercased at init
+        view = _VIEWS[""]
+        products = view.products
+        rows = range(len(products))
+
+        # Apply filters
+        if category:
+            category = category.lower()
+            categories = view.categories
+            rows = [i for i in rows if categories[i] == category]
 
-    if q:
         query = q.lower()
         # Filter products matching the query
-        matching = [
-            p for p in filtered
-            if query in p.get("name", "").lower() or query in p.get("description", "").lower()
-        ]
+        names, descriptions = view.names, view.descriptions
+        matching_rows = {i for i in rows if query in names[i] or query in descriptions[i]}
+        matching = [products[i] for i in rows if i in matching_rows]
 
         # BUG: Inject 2 random unrelated products into search results
         # This simulates a search relevance bug that agents should detect and report
-        non_matching = [
-            p for p in filtered
-            if query not in p.get("name", "").lower() and query not in p.get("description", "").lower()
-        ]
+        non_matching = [products[i] for i in rows if i not in matching_rows]
 
         import random
         if len(matching) > 0 and len(non_matching) >= 2:
@@ -610,35 +843,28 @@ def get_products(
             filtered = matching
 
         # Always sort so that relevant products come first; keep unrelated for reporting
+        relevant = {id(p) for p in matching}
         filtered = sorted(
             filtered,
-            key=lambda p: (
-                0 if query in p.get("name", "").lower() or query in p.get("description", "").lower() else 1,
-                p.get("price", 0)
-            )
+            key=lambda p: (0 if id(p) in relevant else 1, p.get("price", 0))
         )
 
-    if min_price is not None:
-        filtered = [p for p in filtered if p["price"] >= min_price]
-    if max_price is not None:
-        filtered = [p for p in filtered if p["price"] <= max_price]
-    
-    # Sort
-    if sort == "price_asc":
-        filtered.sort(key=lambda x: x["price"])
-    elif sort == "price_desc":
-        filtered.sort(key=lambda x: x["price"], reverse=True)
-    elif sort == "name":
-        filtered.sort(key=lambda x: x["name"])
-    elif sort == "rating":
-        filtered.sort(key=lambda x: x.get("rating", 0), reverse=True)
-    
+        if min_price is not None:
+            filtered = [p for p in filtered if p["price"] >= min_price]
+        if max_price is not None:
+            filtered = [p for p in filtered if p["price"] <= max_price]
+
+        # Sort
+        if sort in _SORT_KEYS:
+            key, reverse = _SORT_KEYS[sort]
+            filtered.sort(key=key, reverse=reverse)
+
     # Pagination
     start = (page - 1) * limit
     end = start + limit
     total_pages = (len(filtered) + limit - 1) // limit
     
-    return {
+    return ORJSONResp({
         "products": filtered[start:end],
         "total": len(filtered),
         "page": page,
@@ -646,26 +872,110 @@ def get_products(
         "total_pages": total_pages,
         # alias for existing front-end usage
         "pages": total_pages,
-    }
+    })
+
+
+@lru_cache(maxsize=256)
+def _products_page(
+    category: Optional[str],
+    min_price: Optional[float],
+    max_price: Optional[float],
+    sort: str,
+    page: int,
+    limit: int,
+) -> bytes:
+    """Serialized /api/products body for a non-search query; cleared by _index_catalog()."""
+    products, rows = _filter_sorted(category, min_price, max_price, sort)
+    start = (page - 1) * limit
+    total_pages = (len(rows) + limit - 1) // limit
+    return ORJSONResp({
+        # Only the page's rows are turned back into product dicts
+        "products": [products[i] for i in rows[start:start + limit]],
+        "total": len(rows),
+        "page": page,
+        "limit": limit,
+        "total_pages": total_pages,
+        # alias for existing front-end usage
+        "pages": total_pages,
+    }).body
+
+
+@lru_cache(maxsize=256)
+def _products_page_gzip(*key: Any) -> bytes:
+    return gzip.compress(_products_page(*key), compresslevel=6)
+
+
+def _filter_sorted(
+    category: Optional[str],
+    min_price: Optional[float],
+    max_price: Optional[float],
+    sort: str,
+) -> Tuple[Tuple[Dict, ...], Sequence[int]]:
+    """Filter a presorted catalog view; same order as filtering _PRODUCTS then sorting.
+
+    Returns the view's products and the indexes of the matching rows.
+    """
+    view = _VIEWS.get(sort, _VIEWS[""])
+    prices = view.prices
+    lo, hi = 0, len(prices)
+
+    # The price-sorted views are contiguous in price, so the range is a bisect slice
+    if sort == "price_asc":
+        if min_price is not None:
+            lo = bisect_left(prices, min_price)
+        if max_price is not None:
+            hi = bisect_right(prices, max_price)
+        min_price = max_price = None
+    elif sort == "price_desc":
+        if max_price is not None:
+            lo = bisect_left(prices, -max_price, key=neg)
+        if min_price is not None:
+            hi = bisect_right(prices, -min_price, key=neg)
+        min_price = max_price = None
+
+    # Filter row indexes against the columns; only matches touch the product dicts
+    rows = range(lo, hi)
+    if category:
+        category = category.lower()
+        categories = view.categories
+        rows = [i for i in rows if categories[i] == category]
+    if min_price is not None:
+        rows = [i for i in rows if prices[i] >= min_price]
+    if max_price is not None:
+        rows = [i for i in rows if prices[i] <= max_price]
+    return view.products, rows
+
+
+@app.get("/api/catalog")
+async def catalog_snapshot(request: Request):
+    """Full product list, pre-serialized; answers 304 when the client's ETag is current."""
+    headers = {"ETag": _CATALOG_ETAG, "Cache-Control": "public, max-age=60"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match == "*" or _CATALOG_ETAG in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(_CATALOG_BYTES, media_type="application/json", headers=headers)
+
+
+@lru_cache(maxsize=256)
+def _product_json(product_id: str) -> Optional[bytes]:
+    """Serialized product body, or None if unknown; cleared by _index_catalog()."""
+    product = _PRODUCTS_BY_ID.get(product_id)
+    return ORJSONResp(product).body if product else None
 
 
 @app.get("/api/products/{product_id}")
-def get_product(product_id: str):
+async def get_product(product_id: str):
     """Get a single product by ID."""
-    _init_product_catalog()
-    
-    product = next((p for p in _PRODUCTS if p["id"] == product_id), None)
-    if not product:
+    body = _product_json(product_id)
+    if body is None:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    return product
+    return Response(body, media_type="application/json")
 
 
 @app.post("/api/products")
-def create_product(product: Product):
+async def create_product(product: Product):
     """Create a new product (admin operation)."""
-    _init_product_catalog()
-    
     # Validation
     if product.price < 0:
         raise HTTPException(status_code=400, detail="Price cannot be negative")
@@ -673,7 +983,8 @@ def create_product(product: Product):
         raise HTTPException(status_code=400, detail="Stock cannot be negative")
     
     new_product = {
-        "id": f"prod_{len(_PRODUCTS) + 1}",
+        # Random ids stay unique without reading the catalog size
+        "id": f"prod_{uuid4().hex[:12]}",
         "name": product.name,
         "description": product.description,
         "price": product.price,
@@ -683,15 +994,15 @@ def create_product(product: Product):
         "reviews_count": 0,
         "image": "/images/product_1_wireless_bluetooth_headphones_with_noise_cancellat.jpg"
     }
-    _PRODUCTS.append(new_product)
-    return new_product
+    async with _CATALOG_LOCK:
+        _PRODUCTS.append(new_product)
+        _index_catalog()
+    return ORJSONResp(new_product)
 
 
 @app.post("/api/cart/add")
-def add_to_cart(item: CartItem, session_id: str = Query("default")):
+async def add_to_cart(item: CartItem, session_id: str = Query("default")):
     """Add item to shopping cart."""
-    _init_product_catalog()
-    
     # Validation
     if item.quantity <= 0:
         raise HTTPException(status_code=400, detail="Quantity must be positive")
@@ -699,7 +1010,7 @@ def add_to_cart(item: CartItem, session_id: str = Query("default")):
         raise HTTPException(status_code=400, detail="Quantity cannot exceed 100")
     
     # Check if product exists
-    product = next((p for p in _PRODUCTS if p["id"] == item.product_id), None)
+    product = _PRODUCTS_BY_ID.get(item.product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
@@ -707,165 +1018,189 @@ def add_to_cart(item: CartItem, session_id: str = Query("default")):
     if item.quantity > product["stock"]:
         raise HTTPException(status_code=400, detail=f"Only {product['stock']} items available")
     
-    # Initialize cart if needed
-    if session_id not in _CARTS:
-        _CARTS[session_id] = []
+    async with _cart_lock(session_id):
+        # Initialize cart if needed
+        if session_id not in _CARTS:
+            _CARTS[session_id] = {}
+            _CART_ADDED_AT[session_id] = {}
     
-    # Add or update item in cart
-    existing = next((c for c in _CARTS[session_id] if c["product_id"] == item.product_id), None)
-    if existing:
-        existing["quantity"] += item.quantity
-    else:
-        _CARTS[session_id].append({
-            "product_id": item.product_id,
-            "quantity": item.quantity,
-            "added_at": datetime.now().isoformat()
-        })
+        # Add or update item in cart
+        cart = _CARTS[session_id]
+        if item.product_id in cart:
+            cart[item.product_id] += item.quantity
+        else:
+            cart[item.product_id] = item.quantity
+            _CART_ADDED_AT[session_id][item.product_id] = time.time()
     
-    return {"message": "Item added to cart", "cart_size": len(_CARTS[session_id])}
+        return ORJSONResp({"message": "Item added to cart", "cart_size": len(_CARTS[session_id])})
 
 
 @app.get("/api/cart")
-def get_cart(session_id: str = Query("default")):
+async def get_cart(session_id: str = Query("default")):
     """Get shopping cart contents."""
-    _init_product_catalog()
-    
     if session_id not in _CARTS:
-        return {"items": [], "total": 0}
-    
-    cart_items = []
-    total = 0
+        return ORJSONResp({"items": [], "total": 0})
     
-    for item in _CARTS[session_id]:
-        product = next((p for p in _PRODUCTS if p["id"] == item["product_id"]), None)
-        if product:
-            subtotal = product["price"] * item["quantity"]
-            total += subtotal
-            cart_items.append({
-                "product": product,
-                "quantity": item["quantity"],
-                "subtotal": subtotal
-            })
+    # One pass over the cart; the index lookup is hoisted into a local
+    get = _PRODUCTS_BY_ID.get
+    cart_items = [
+        {"product": product, "quantity": quantity, "subtotal": product["price"] * quantity}
+        for product_id, quantity in _CARTS[session_id].items()
+        if (product := get(product_id))
+    ]
+    total = sum(line["subtotal"] for line in cart_items)
     
-    return {"items": cart_items, "total": total}
+    return ORJSONResp({"items": cart_items, "total": total})
 
 
 @app.delete("/api/cart")
-def clear_cart(session_id: str = Query("default")):
+async def clear_cart(session_id: str = Query("default")):
     """Clear entire shopping cart."""
-    if session_id in _CARTS:
-        _CARTS[session_id] = []
-    return {"message": "Cart cleared", "cart_size": 0}
+    async with _cart_lock(session_id):
+        if session_id in _CARTS:
+            _CARTS[session_id] = {}
+            _CART_ADDED_AT[session_id] = {}
+        return ORJSONResp({"message": "Cart cleared", "cart_size": 0})
 
 
 @app.delete("/api/cart/all")
-def clear_all_carts():
+async def clear_all_carts():
     """Clear all shopping carts for all sessions."""
-    _CARTS.clear()
-    return {"message": "All carts cleared", "total_sessions_cleared": len(_CARTS)}
+    async with AsyncExitStack() as stack:
+        for lock in list(_CART_LOCKS.values()):
+            await stack.enter_async_context(lock)
+        _CARTS.clear()
+        _CART_ADDED_AT.clear()
+    return ORJSONResp({"message": "All carts cleared", "total_sessions_cleared": len(_CARTS)})
 
 
 @app.delete("/api/cart/item/{product_id}")
-def remove_from_cart(product_id: str, session_id: str = Query("default")):
+async def remove_from_cart(product_id: str, session_id: str = Query("default")):
     """Remove item from shopping cart."""
-    _init_product_catalog()
+    async with _cart_lock(session_id):
+        # Initialize cart if it doesn't exist (shouldn't happen, but handle gracefully)
+        if session_id not in _CARTS:
+            return ORJSONResp({"message": "Item removed from cart", "cart_size": 0})
     
-    # Initialize cart if it doesn't exist (shouldn't happen, but handle gracefully)
-    if session_id not in _CARTS:
-        return {"message": "Item removed from cart", "cart_size": 0}
-    
-    # Find and remove the item
-    cart = _CARTS[session_id]
-    initial_length = len(cart)
-    _CARTS[session_id] = [item for item in cart if item["product_id"] != product_id]
+        # Find and remove the item
+        _CARTS[session_id].pop(product_id, None)
+        _CART_ADDED_AT[session_id].pop(product_id, None)
     
-    # If item wasn't found, that's okay - just return success
-    # (idempotent operation)
-    cart_size = len(_CARTS[session_id])
+        # If item wasn't found, that's okay - just return success
+        # (idempotent operation)
+        cart_size = len(_CARTS[session_id])
     
-    # If cart is now empty, we can optionally remove the session
-    # But keep it for consistency - empty cart is still a valid state
-    if cart_size == 0:
-        # Keep empty cart session for consistency
-        pass
+        # If cart is now empty, we can optionally remove the session
+        # But keep it for consistency - empty cart is still a valid state
+        if cart_size == 0:
+            # Keep empty cart session for consistency
+            pass
     
-    return {"message": "Item removed from cart", "cart_size": cart_size}
+        return ORJSONResp({"message": "Item removed from cart", "cart_size": cart_size})
 
 
 @app.put("/api/cart/item/{product_id}")
-def update_cart_item(product_id: str, quantity: int = Query(..., ge=1, le=100), session_id: str = Query("default")):
+async def update_cart_item(product_id: str, quantity: int = Query(..., ge=1, le=100), session_id: str = Query("default")):
     """Update item quantity in shopping cart."""
-    _init_product_catalog()
+    async with _cart_lock(session_id):
+        if session_id not in _CARTS:
+            raise HTTPException(status_code=404, detail="Cart not found")
     
-    if session_id not in _CARTS:
-        raise HTTPException(status_code=404, detail="Cart not found")
+        # Find the item
+        if product_id not in _CARTS[session_id]:
+            raise HTTPException(status_code=404, detail="Item not found in cart")
     
-    # Find the item
-    item = next((c for c in _CARTS[session_id] if c["product_id"] == product_id), None)
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found in cart")
-    
-    # Check product stock
-    product = next((p for p in _PRODUCTS if p["id"] == product_id), None)
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
+        # Check product stock
+        product = _PRODUCTS_BY_ID.get(product_id)
+        if not product:
+            raise HTTPException(status_code=404, detail="Product not found")
     
-    if quantity > product["stock"]:
-        raise HTTPException(status_code=400, detail=f"Only {product['stock']} items available")
+        if quantity > product["stock"]:
+            raise HTTPException(status_code=400, detail=f"Only {product['stock']} items available")
     
-    # Update quantity
-    item["quantity"] = quantity
+        # Update quantity
+        _CARTS[session_id][product_id] = quantity
     
-    return {"message": "Item quantity updated", "cart_size": len(_CARTS[session_id])}
+        return ORJSONResp({"message": "Item quantity updated", "cart_size": len(_CARTS[session_id])})
 
 
 @app.post("/api/checkout")
-def checkout(request: CheckoutRequest):
+async def checkout(request: CheckoutRequest):
     """Process checkout and create order."""
-    _init_product_catalog()
+    async with _cart_lock(request.session_id):
+        if request.session_id not in _CARTS or not _CARTS[request.session_id]:
+            raise HTTPException(status_code=400, detail="Cart is empty")
     
-    if request.session_id not in _CARTS or not _CARTS[request.session_id]:
-        raise HTTPException(status_code=400, detail="Cart is empty")
+        # Create order
+        cart = _CARTS[request.session_id]
+        added_at = _CART_ADDED_AT[request.session_id]
+        order = {
+            "id": str(uuid4()),
+            "items": [
+                {
+                    "product_id": product_id,
+                    "quantity": quantity,
+                    "added_at": datetime.fromtimestamp(added_at[product_id]).isoformat(),
+                }
+                for product_id, quantity in cart.items()
+            ],
+            "total": sum(
+                _PRODUCTS_BY_ID[product_id]["price"] * quantity
+                if product_id in _PRODUCTS_BY_ID
+                else 0
+                for product_id, quantity in cart.items()
+            ),
+            "status": "pending",
+            "created_at": _now_iso(),
+            "shipping_address": request.shipping_address,
+            "payment_method": request.payment_method
+        }
     
-    # Create order
-    order = {
-        "id": str(uuid4()),
-        "items": _CARTS[request.session_id].copy(),
-        "total": sum(
-            next((p["price"] for p in _PRODUCTS if p["id"] == item["product_id"]), 0) * item["quantity"]
-            for item in _CARTS[request.session_id]
-        ),
-        "status": "pending",
-        "created_at": datetime.now().isoformat(),
-        "shipping_address": request.shipping_address,
-        "payment_method": request.payment_method
-    }
+        async with _DB_WRITE_LOCK:
+            with _DB_WRITER:
+                _DB_WRITER.execute(
+                    "INSERT INTO orders (id, session_id, total, status, created_at, payload) VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        order["id"],
+                        request.session_id,
+                        order["total"],
+                        order["status"],
+                        order["created_at"],
+                        _json_dumps(order),
+                    ),
+                )
     
-    _ORDERS.append(order)
+        # Clear cart
+        _CARTS[request.session_id] = {}
+        _CART_ADDED_AT[request.session_id] = {}
     
-    # Clear cart
-    _CARTS[request.session_id] = []
-    
-    return {"order_id": order["id"], "message": "Order placed successfully", "order": order}
+        return ORJSONResp({"order_id": order["id"], "message": "Order placed successfully", "order": order})
 
 
 @app.get("/api/orders")
-def get_orders(session_id: str = Query("default")):
-    """Get order history."""
-    return {"orders": _ORDERS}
+async def get_orders(session_id: str = Query("default")):
+    """Get the session's most recent orders, newest first."""
+    rows = _DB_READER.execute(
+        "SELECT payload FROM orders WHERE session_id = ? ORDER BY created_at DESC LIMIT ?",
+        (session_id, _ORDERS_HISTORY_LIMIT),
+    ).fetchall()
+    # payload already holds each order's JSON, so splice it in rather than decoding and re-encoding
+    return Response(
+        b'{"orders":[' + b",".join(bytes(row[0]) for row in rows) + b"]}",
+        media_type="application/json",
+    )
 
 
 @app.post("/api/products/{product_id}/reviews")
-def add_review(product_id: str, review: Review):
+async def add_review(product_id: str, review: Review):
     """Add a review for a product."""
-    _init_product_catalog()
-    
+    global _review_flush_task
     # Validation
     if review.rating < 1 or review.rating > 5:
         raise HTTPException(status_code=400, detail="Rating must be between 1 and 5")
     
     # Check if product exists
-    product = next((p for p in _PRODUCTS if p["id"] == product_id), None)
+    product = _PRODUCTS_BY_ID.get(product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
@@ -873,40 +1208,76 @@ def add_review(product_id: str, review: Review):
     if product_id not in _REVIEWS:
         _REVIEWS[product_id] = []
     
+    date = _now_iso()
     _REVIEWS[product_id].append({
         "rating": review.rating,
         "title": review.title,
         "comment": review.comment,
         "reviewer_name": review.reviewer_name,
-        "date": datetime.now().isoformat()
+        "date": date
     })
+    agg = _REVIEW_AGG.setdefault(product_id, [0, 0])
+    agg[0] += 1
+    agg[1] += review.rating
+    _REVIEWS_JSON.pop(product_id, None)
     
-    return {"message": "Review added successfully"}
+    # Persisted write-behind: readers are served from _REVIEWS, so the row can wait for the next flush
+    _REVIEW_BUFFER.append((product_id, review.rating, review.title, review.comment, review.reviewer_name, date))
+    if _review_flush_task is None or _review_flush_task.done():
+        _review_flush_task = asyncio.get_running_loop().create_task(_flush_reviews())
+    
+    return ORJSONResp({"message": "Review added successfully"})
 
 
 @app.get("/api/products/{product_id}/reviews")
-def get_reviews(product_id: str):
-    """Get reviews for a product."""
-    _init_product_catalog()
-    
+async def get_reviews(
+    product_id: str,
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0)
+):
+    """Get reviews for a product, optionally one page at a time.
+
+    ``count`` and ``average_rating`` always describe every review of the
+    product and come from the running totals kept by ``add_review``.
+    """
     if product_id not in _REVIEWS:
-        return {"reviews": [], "count": 0, "average_rating": 0}
+        return ORJSONResp({"reviews": [], "count": 0, "average_rating": 0})
+    
+    paged = offset or limit is not None
+    if not paged:
+        body = _REVIEWS_JSON.get(product_id)
+        if body is not None:
+            return Response(body, media_type="application/json")
     
     reviews = _REVIEWS[product_id]
-    avg_rating = sum(r["rating"] for r in reviews) / len(reviews) if reviews else 0
+    if paged:
+        reviews = reviews[offset:None if limit is None else offset + limit]
+    count, total = _REVIEW_AGG.get(product_id, (0, 0))
+    avg_rating = total / count if count else 0
     
-    return {
+    response = ORJSONResp({
         "reviews": reviews,
-        "count": len(reviews),
+        "count": count,
         "average_rating": round(avg_rating, 2)
-    }
+    })
+    if not paged:
+        _REVIEWS_JSON[product_id] = response.body
+    return response
 
 
 @app.get("/health")
-def health_check():
+async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+    return ORJSONResp({"status": "healthy", "timestamp": _now_iso()})
 
 
-# Initialize catalog on startup
+# Initialize catalog once at import; handlers assume it is populated
 _init_product_catalog()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # uvloop and httptools come with uvicorn[standard]; access logging is a
+    # measurable bottleneck at high request rates
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="uvloop", http="httptools", log_level="warning", access_log=False)
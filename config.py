@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
 import yaml
 from pydantic_settings import BaseSettings
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml; use the pure-Python loader
+    from yaml import SafeLoader as _YamlLoader
+
 
 class Settings(BaseSettings):
     """Runtime configuration sourced from environment variables."""
@@ -15,6 +21,10 @@ class Settings(BaseSettings):
     max_retries: int = 2
     seed: int = 42
     version: str = "v1.0"
+    browser_pool_size: int = 1  # Browsers kept alive across sessions
+    session_batch_size: int = 64  # Max CSV rows written per batch
+    session_format: str = "csv"  # "csv" or "jsonl"; experiment imports read either
+    session_dedupe_proposals: bool = False  # Hash proposals into proposals.jsonl
 
     class Config:
         env_file = "config/.env"
@@ -22,24 +32,35 @@ class Settings(BaseSettings):
         extra = "ignore"  # Ignore extra fields from .env file
 
 
+@lru_cache(maxsize=1)
 def load_settings() -> Settings:
-    """Provide a reusable settings singleton."""
+    """Provide a reusable settings singleton; config/.env is read once per process."""
 
     return Settings()
 
 
+_MODEL_CFG_CACHE: dict[tuple[str, int], dict[str, Any]] = {}  # (path, mtime_ns) -> parsed config
+
+
 def load_model_config(path: str | Path = "config/model_config.yaml") -> dict[str, Any]:
     """Load multi-provider model configuration from YAML.
 
     Returns the full config with providers, temperature, and models list.
+    Parsed configs are cached per path and reused until the file's mtime
+    changes; callers must treat the returned dict as read-only.
     """
 
     cfg_path = Path(path)
-    if not cfg_path.exists():
-        raise FileNotFoundError(f"Model config not found at {cfg_path}")
+    try:
+        key = (str(cfg_path), cfg_path.stat().st_mtime_ns)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Model config not found at {cfg_path}") from None
+    cached = _MODEL_CFG_CACHE.get(key)
+    if cached is not None:
+        return cached
 
     with cfg_path.open("r", encoding="utf-8") as handle:
-        data = yaml.safe_load(handle) or {}
+        data = yaml.load(handle, Loader=_YamlLoader) or {}
 
     if "models" not in data:
         raise ValueError("model_config.yaml must contain a 'models' list.")
@@ -50,6 +71,7 @@ def load_model_config(path: str | Path = "config/model_config.yaml") -> dict[str
         if "provider" not in model:
             raise ValueError(f"Model '{model.get('name', 'unknown')}' must have a 'provider' field.")
 
+    _MODEL_CFG_CACHE[key] = data
     return data
 
 
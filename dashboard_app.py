@@ -1,5 +1,7 @@
 """Interactive Streamlit dashboard for visualizing multi-agent test results."""
+import io
 import json
+import re
 from pathlib import Path
 
 import pandas as pd
@@ -8,6 +10,11 @@ import plotly.graph_objects as go
 import streamlit as st
 from PIL import Image
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:  # orjson is optional; fall back to the stdlib decoder
+    _json_loads = json.loads
+
 
 st.set_page_config(
     page_title="Multi-Agent Beta Testing Dashboard",
@@ -16,23 +23,93 @@ st.set_page_config(
 )
 
 
-def load_csv_data(uploaded_file):
-    """Load and parse CSV data."""
-    df = pd.read_csv(uploaded_file)
+# Key written in place of agent_proposals when the session deduplicates proposals
+_PROPOSAL_KEY = re.compile(r"[0-9a-f]{16}")
+
+
+def _parse_proposals_jsonl(proposals_bytes: bytes) -> dict:
+    """Decode proposals.jsonl (``key<TAB>json`` per line) into {key: value}."""
+    table = {}
+    for line in proposals_bytes.decode("utf-8").splitlines():
+        key, _, blob = line.partition("\t")
+        if key:
+            table[key] = _json_loads(blob)
+    return table
+
+
+@st.cache_data(show_spinner=False)
+def load_csv_data(file_bytes: bytes, proposals_bytes: bytes | None = None):
+    """Load and parse CSV data.
+
+    Cached on the raw upload bytes, so widget reruns reuse the parsed frame
+    and a different file is parsed afresh. ``proposals_bytes`` is the
+    session's proposals.jsonl, needed when agent_proposals holds keys.
+    """
+    df = pd.read_csv(io.BytesIO(file_bytes))
+    interned = _parse_proposals_jsonl(proposals_bytes) if proposals_bytes else {}
     
     # Parse JSON columns
+    # Empty cells are read back as NaN, so any non-str value counts as missing
     if 'agent_proposals' in df.columns:
-        df['agent_proposals_parsed'] = df['agent_proposals'].apply(
-            lambda x: json.loads(x) if pd.notna(x) else []
-        )
+        parsed = []
+        for x in df['agent_proposals'].to_numpy():
+            if not isinstance(x, str):
+                parsed.append([])
+            elif x in interned:
+                parsed.append(interned[x])
+            elif _PROPOSAL_KEY.fullmatch(x):
+                raise ValueError(
+                    "agent_proposals holds proposals.jsonl keys; upload the session's proposals.jsonl too"
+                )
+            else:
+                parsed.append(_json_loads(x))
+        df['agent_proposals_parsed'] = parsed
     if 'confidence_scores' in df.columns:
-        df['confidence_scores_parsed'] = df['confidence_scores'].apply(
-            lambda x: json.loads(x) if pd.notna(x) else {}
-        )
+        df['confidence_scores_parsed'] = [
+            _json_loads(x) if isinstance(x, str) else {} for x in df['confidence_scores'].to_numpy()
+        ]
     
     return df
 
 
+# Figure builders take hashable column tuples so st.cache_data can skip rebuilding
+# on reruns where the data has not changed; each call gets its own Figure copy.
+
+@st.cache_data(show_spinner=False)
+def _make_action_pie(values: tuple, names: tuple) -> go.Figure:
+    return px.pie(
+        values=list(values),
+        names=list(names),
+        title='Action Types Distribution',
+    )
+
+
+@st.cache_data(show_spinner=False)
+def _make_latency_bar(turns: tuple, latencies: tuple) -> go.Figure:
+    return px.bar(
+        pd.DataFrame({'turn': turns, 'latency': latencies}),
+        x='turn',
+        y='latency',
+        title='Latency per Turn',
+        labels={'latency': 'Latency (seconds)', 'turn': 'Turn'},
+        color='latency',
+        color_continuous_scale='Viridis',
+    )
+
+
+@st.cache_data(show_spinner=False)
+def _make_agreement_line(turns: tuple, agreement_rates: tuple) -> go.Figure:
+    fig = px.line(
+        pd.DataFrame({'turn': turns, 'agreement_rate': agreement_rates}),
+        x='turn',
+        y='agreement_rate',
+        title='Agent Agreement Rate Over Time',
+        labels={'agreement_rate': 'Agreement %', 'turn': 'Turn'},
+    )
+    fig.update_traces(mode='lines+markers')
+    return fig
+
+
 def display_metrics(df):
     """Display key metrics in cards."""
     st.header("📊 Session Metrics")
@@ -66,8 +143,7 @@ def display_agent_agreement(df):
     
     agreement_data = []
     
-    for idx, row in df.iterrows():
-        proposals = row['agent_proposals_parsed']
+    for turn, proposals in zip(df['turn'].to_numpy(), df['agent_proposals_parsed']):
         if not proposals:
             continue
         
@@ -79,7 +155,7 @@ def display_agent_agreement(df):
         agreement_rate = (total_agents - unique_actions + 1) / total_agents if total_agents > 0 else 0
         
         agreement_data.append({
-            'turn': row['turn'],
+            'turn': turn,
             'agreement_rate': agreement_rate * 100,
             'unique_proposals': unique_actions,
         })
@@ -87,14 +163,10 @@ def display_agent_agreement(df):
     if agreement_data:
         agreement_df = pd.DataFrame(agreement_data)
         
-        fig = px.line(
-            agreement_df,
-            x='turn',
-            y='agreement_rate',
-            title='Agent Agreement Rate Over Time',
-            labels={'agreement_rate': 'Agreement %', 'turn': 'Turn'},
+        fig = _make_agreement_line(
+            tuple(agreement_df['turn'].tolist()),
+            tuple(agreement_df['agreement_rate'].tolist()),
         )
-        fig.update_traces(mode='lines+markers')
         st.plotly_chart(fig, use_container_width=True)
         
         avg_agreement = agreement_df['agreement_rate'].mean()
@@ -105,15 +177,15 @@ def display_turn_details(df):
     """Interactive turn-by-turn viewer."""
     st.header("🔍 Turn-by-Turn Analysis")
     
-    for idx, row in df.iterrows():
-        turn_num = row['turn']
+    for idx, row in enumerate(df.itertuples(index=False)):
+        turn_num = row.turn
         
-        with st.expander(f"Turn {turn_num}: {row['action_type']} → {row['action_target']}", expanded=(idx == 0)):
+        with st.expander(f"Turn {turn_num}: {row.action_type} → {row.action_target}", expanded=(idx == 0)):
             col1, col2 = st.columns([1, 1])
             
             with col1:
                 st.subheader("📸 Screenshot")
-                screenshot_path = Path(row['screenshot_path'])
+                screenshot_path = Path(row.screenshot_path)
                 
                 if screenshot_path.exists():
                     try:
@@ -127,7 +199,7 @@ def display_turn_details(df):
             with col2:
                 st.subheader("🤖 Agent Proposals")
                 
-                proposals = row.get('agent_proposals_parsed', [])
+                proposals = getattr(row, 'agent_proposals_parsed', [])
                 if proposals:
                     for proposal in proposals:
                         agent_id = proposal.get('agent_id', 'Unknown')
@@ -144,12 +216,12 @@ def display_turn_details(df):
                     st.info("No proposal data available")
                 
                 st.subheader("✅ Validation")
-                st.write(f"**Success:** {row['success']}")
-                st.write(f"**Safety Pass:** {row['safety_pass']}")
-                st.write(f"**Latency:** {row['latency']:.3f}s")
+                st.write(f"**Success:** {row.success}")
+                st.write(f"**Safety Pass:** {row.safety_pass}")
+                st.write(f"**Latency:** {row.latency:.3f}s")
                 
-                if row['validators']:
-                    st.write(f"**Validators:** {row['validators']}")
+                if row.validators:
+                    st.write(f"**Validators:** {row.validators}")
 
 
 def display_action_distribution(df):
@@ -158,11 +230,7 @@ def display_action_distribution(df):
     
     action_counts = df['action_type'].value_counts()
     
-    fig = px.pie(
-        values=action_counts.values,
-        names=action_counts.index,
-        title='Action Types Distribution',
-    )
+    fig = _make_action_pie(tuple(action_counts.tolist()), tuple(action_counts.index.tolist()))
     st.plotly_chart(fig, use_container_width=True)
 
 
@@ -170,15 +238,7 @@ def display_latency_chart(df):
     """Show latency over time."""
     st.header("⏱️ Latency Analysis")
     
-    fig = px.bar(
-        df,
-        x='turn',
-        y='latency',
-        title='Latency per Turn',
-        labels={'latency': 'Latency (seconds)', 'turn': 'Turn'},
-        color='latency',
-        color_continuous_scale='Viridis',
-    )
+    fig = _make_latency_bar(tuple(df['turn'].tolist()), tuple(df['latency'].tolist()))
     st.plotly_chart(fig, use_container_width=True)
 
 
@@ -195,13 +255,21 @@ def main():
             type=['csv'],
             help="Upload the CSV file generated by your test session",
         )
+        proposals_file = st.file_uploader(
+            "Upload proposals.jsonl (optional)",
+            type=['jsonl'],
+            help="Needed for sessions logged with proposal deduplication",
+        )
     
     if uploaded_file is None:
         return
     
     # Load data
     try:
-        df = load_csv_data(uploaded_file)
+        df = load_csv_data(
+            uploaded_file.getvalue(),
+            proposals_file.getvalue() if proposals_file is not None else None,
+        )
         
         session_id = df['session_id'].iloc[0] if len(df) > 0 else "Unknown"
         st.success(f"✅ Loaded {len(df)} turns from session: {session_id}")
@@ -13,12 +13,87 @@ Usage:
 """
 
 import sqlite3
+from functools import lru_cache
 import numpy as np
 from scipy import stats
-from typing import Dict, List, Tuple, Optional
+from typing import Any, Dict, List, Tuple, Optional, Union
 from dataclasses import dataclass
 import json
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional (the "fast" extra); fall back to NumPy reductions
+    njit = None
+
+
+BOOTSTRAP_BATCH = 1024  # resamples scipy.stats.bootstrap evaluates per block
+
+# Cohen's d thresholds: |d| < 0.2 negligible, < 0.5 small, < 0.8 medium, else large
+_EFFECT_BINS = np.array([0.2, 0.5, 0.8])
+_EFFECT_LABELS = ('negligible', 'small', 'medium', 'large')
+
+
+def _summary_loop(values: np.ndarray) -> Tuple[float, float]:
+    """(mean, sum of squared deviations) in a single Welford pass"""
+    mean = m2 = 0.0
+    for i in range(values.shape[0]):
+        delta = values[i] - mean
+        mean += delta / (i + 1)
+        m2 += delta * (values[i] - mean)
+    return mean, m2
+
+
+def _summary_numpy(values: np.ndarray) -> Tuple[float, float]:
+    """Same result as _summary_loop, using NumPy reductions"""
+    mean = values.mean()
+    return mean, np.square(values - mean).sum()
+
+
+_summary_kernel = njit(cache=True)(_summary_loop) if njit is not None else _summary_numpy
+
+
+def _cohens_d_loop(group1: np.ndarray, group2: np.ndarray) -> float:
+    """Cohen's d from one summary pass per group"""
+    mean1, m2_1 = _summary_kernel(group1)
+    mean2, m2_2 = _summary_kernel(group2)
+
+    dof = group1.shape[0] + group2.shape[0] - 2
+    if dof <= 0:
+        return np.nan
+    # Pooled standard deviation
+    pooled_std = np.sqrt((m2_1 + m2_2) / dof)
+    if pooled_std == 0:
+        return 0.0
+    return (mean2 - mean1) / pooled_std
+
+
+def _cohens_d_numpy(group1: np.ndarray, group2: np.ndarray) -> float:
+    """Same result as _cohens_d_loop, using NumPy reductions"""
+    dof = len(group1) + len(group2) - 2
+    if dof <= 0:
+        return np.nan
+    mean1, m2_1 = _summary_numpy(group1)
+    mean2, m2_2 = _summary_numpy(group2)
+    pooled_std = np.sqrt((m2_1 + m2_2) / dof)
+    if pooled_std == 0:
+        return 0.0
+    return (mean2 - mean1) / pooled_std
+
+
+_cohens_d_kernel = njit(cache=True)(_cohens_d_loop) if njit is not None else _cohens_d_numpy
+
+
+def _t_ci(mean, std, n: int, confidence: float = 0.95):
+    """Student-t confidence interval for a mean: mean ± t(n-1) * std / sqrt(n)
+
+    mean and std may be arrays (one entry per metric). A single observation
+    gives the degenerate interval (mean, mean).
+    """
+    if n < 2:
+        return mean, mean
+    half_width = stats.t.ppf((1 + confidence) / 2, n - 1) * std / np.sqrt(n)
+    return mean - half_width, mean + half_width
+
 
 @dataclass
 class ComparisonResult:
@@ -55,17 +130,68 @@ class ComparisonResult:
 class StatisticalAnalyzer:
     """Performs statistical analysis on experimental results"""
 
-    def __init__(self, database_path: str):
+    def __init__(self, database_path: str, seed: Optional[int] = None):
         self.db_path = database_path
+        self._rng = np.random.default_rng(seed)  # shared by every bootstrap resample
+        self._conn: Optional[sqlite3.Connection] = None  # opened on first query
+        self._columns: Dict[str, set] = {}  # table -> column names, for identifier checks
+        # Query and ANOVA results are memoized until invalidate_cache()
+        self._metric_values = lru_cache(maxsize=256)(self._query_metric_values)
+        self._anova_results: Dict[Tuple[int, str, str], Dict] = {}
+
+    def _cursor(self) -> sqlite3.Cursor:
+        """Cursor on the analyzer's read-only connection, opening it on first use"""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.executescript("""
+                PRAGMA cache_size = -65536;
+                PRAGMA temp_store = MEMORY;
+                PRAGMA mmap_size = 268435456;
+                PRAGMA query_only = 1;
+            """)
+            self._columns = {
+                table: {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+                for table in ("runs", "metrics")
+            }
+        return self._conn.cursor()
+
+    def _column(self, table: str, name: str) -> str:
+        """Return name if it is a column of table; metric and group names are spliced into SQL"""
+        if name not in self._columns[table]:
+            raise ValueError(f"Unknown {table} column: {name!r}")
+        return name
+
+    def invalidate_cache(self) -> None:
+        """Forget memoized metric values and ANOVA results, e.g. after new runs are recorded"""
+        self._metric_values.cache_clear()
+        self._anova_results.clear()
+
+    def close(self) -> None:
+        """Close the database connection (reopened by the next query)"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self) -> "StatisticalAnalyzer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
     def get_metric_values(self, experiment_id: int, metric_name: str,
                          group_by: Optional[str] = None,
                          group_value: Optional[str] = None) -> List[float]:
         """Get all values for a metric, optionally filtered by group"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        return list(self._metric_values(experiment_id, metric_name, group_by, group_value))
+
+    def _query_metric_values(self, experiment_id: int, metric_name: str,
+                             group_by: Optional[str],
+                             group_value: Optional[str]) -> Tuple[float, ...]:
+        cursor = self._cursor()
+        metric_name = self._column("metrics", metric_name)
 
         if group_by and group_value is not None:
+            group_by = self._column("runs", group_by)
             cursor.execute(f"""
                 SELECT m.{metric_name}
                 FROM metrics m
@@ -75,64 +201,82 @@ class StatisticalAnalyzer:
             """, (experiment_id, group_value))
         else:
             cursor.execute(f"""
-                SELECT {metric_name}
+                SELECT m.{metric_name}
                 FROM metrics m
                 JOIN runs r ON m.run_id = r.id
                 WHERE r.experiment_id = ? AND m.{metric_name} IS NOT NULL
             """, (experiment_id,))
 
-        values = [row[0] for row in cursor.fetchall()]
-        conn.close()
+        return tuple(row[0] for row in cursor.fetchall())
 
-        return values
+    def _fetch_metric_grouped(self, experiment_id: int, metric_name: str,
+                              group_by: str) -> Dict[Any, np.ndarray]:
+        """Metric values for every group_by value of an experiment, in group order
+
+        Groups whose runs have no value for the metric map to an empty array.
+        """
+        cursor = self._cursor()
+        metric_name = self._column("metrics", metric_name)
+        group_by = self._column("runs", group_by)
+
+        cursor.execute(f"""
+            SELECT r.{group_by}, m.{metric_name}
+            FROM runs r
+            LEFT JOIN metrics m ON m.run_id = r.id AND m.{metric_name} IS NOT NULL
+            WHERE r.experiment_id = ?
+            ORDER BY r.{group_by}
+        """, (experiment_id,))
+
+        rows = cursor.fetchall()
+        if not rows:
+            return {}
+        keys, values = zip(*rows)
+        keys = np.array(keys, dtype=object)
+        values = np.array(values, dtype=np.float64)  # NULL (run without a value) -> nan
+
+        # Rows arrive sorted by group: each group starts where the key changes
+        starts = np.concatenate(([0], np.flatnonzero(keys[1:] != keys[:-1]) + 1))
+        present = ~np.isnan(values)
+        counts = np.add.reduceat(present, starts)
+
+        # One compacted allocation, split into contiguous per-group views
+        arrays = np.split(values[present], np.cumsum(counts)[:-1])
+        return dict(zip(keys[starts].tolist(), arrays))
 
     def bootstrap_confidence_interval(self, data: List[float],
                                      confidence: float = 0.95,
                                      n_bootstrap: int = 10000) -> Tuple[float, float, float]:
         """Calculate bootstrap confidence interval"""
-        if not data:
+        if len(data) == 0:
             return 0.0, 0.0, 0.0
 
-        bootstrap_means = []
-        for _ in range(n_bootstrap):
-            sample = np.random.choice(data, size=len(data), replace=True)
-            bootstrap_means.append(np.mean(sample))
+        arr = np.asarray(data, dtype=np.float64)
+        mean = np.mean(arr)
+        if len(arr) < 2:
+            return mean, mean, mean
 
-        alpha = 1 - confidence
-        lower = np.percentile(bootstrap_means, alpha/2 * 100)
-        upper = np.percentile(bootstrap_means, (1 - alpha/2) * 100)
-        mean = np.mean(data)
+        # np.mean is vectorized along axis; batch bounds the resample block held in memory
+        result = stats.bootstrap(
+            (arr,), np.mean, n_resamples=n_bootstrap, batch=BOOTSTRAP_BATCH,
+            vectorized=True, confidence_level=confidence, method='percentile',
+            random_state=self._rng
+        )
+        lower, upper = result.confidence_interval
 
         return mean, lower, upper
 
     def cohens_d(self, group1: List[float], group2: List[float]) -> float:
         """Calculate Cohen's d effect size"""
-        if not group1 or not group2:
-            return 0.0
-
-        n1, n2 = len(group1), len(group2)
-        mean1, mean2 = np.mean(group1), np.mean(group2)
-        var1, var2 = np.var(group1, ddof=1), np.var(group2, ddof=1)
-
-        # Pooled standard deviation
-        pooled_std = np.sqrt(((n1 - 1) * var1 + (n2 - 1) * var2) / (n1 + n2 - 2))
-
-        if pooled_std == 0:
+        if len(group1) == 0 or len(group2) == 0:
             return 0.0
 
-        return (mean2 - mean1) / pooled_std
+        return float(_cohens_d_kernel(np.ascontiguousarray(group1, dtype=np.float64),
+                                      np.ascontiguousarray(group2, dtype=np.float64)))
 
     def interpret_effect_size(self, d: float) -> str:
         """Interpret Cohen's d effect size"""
-        abs_d = abs(d)
-        if abs_d < 0.2:
-            return "negligible"
-        elif abs_d < 0.5:
-            return "small"
-        elif abs_d < 0.8:
-            return "medium"
-        else:
-            return "large"
+        # side='right' keeps the strict "<" at each threshold (|d| == 0.2 is "small")
+        return _EFFECT_LABELS[np.searchsorted(_EFFECT_BINS, abs(d), side='right')]
 
     def compare_two_groups(self, experiment_id: int, metric_name: str,
                           group_by: str, group1_value: str, group2_value: str,
@@ -143,24 +287,37 @@ class StatisticalAnalyzer:
         group1_data = self.get_metric_values(experiment_id, metric_name, group_by, group1_value)
         group2_data = self.get_metric_values(experiment_id, metric_name, group_by, group2_value)
 
-        if not group1_data or not group2_data:
+        return self._compare_samples(group1_value, group2_value, group1_data, group2_data, confidence)
+
+    def _compare_samples(self, group1_value, group2_value,
+                         group1_data, group2_data,
+                         confidence: float = 0.95) -> ComparisonResult:
+        """compare_two_groups on already-fetched group data"""
+        if len(group1_data) == 0 or len(group2_data) == 0:
             raise ValueError("Insufficient data for comparison")
+        group1_data = np.asarray(group1_data, dtype=np.float64)
+        group2_data = np.asarray(group2_data, dtype=np.float64)
 
-        # Basic statistics
-        mean1, mean2 = np.mean(group1_data), np.mean(group2_data)
-        std1, std2 = np.std(group1_data, ddof=1), np.std(group2_data, ddof=1)
+        # Basic statistics, all derived from one (mean, squared deviations) pass per group
         n1, n2 = len(group1_data), len(group2_data)
+        mean1, m2_1 = _summary_kernel(group1_data)
+        mean2, m2_2 = _summary_kernel(group2_data)
+        std1 = np.sqrt(m2_1 / (n1 - 1)) if n1 > 1 else np.nan
+        std2 = np.sqrt(m2_2 / (n2 - 1)) if n2 > 1 else np.nan
+        dof = n1 + n2 - 2
+        pooled_var = np.float64((m2_1 + m2_2) / dof) if dof > 0 else np.nan
 
-        # T-test (two-tailed, independent samples)
-        t_stat, p_value = stats.ttest_ind(group1_data, group2_data)
+        # T-test (two-tailed, independent samples, pooled variance)
+        t_stat, p_value = stats.ttest_ind_from_stats(mean1, std1, n1, mean2, std2, n2, equal_var=True)
 
         # Effect size
-        d = self.cohens_d(group1_data, group2_data)
+        pooled_std = np.sqrt(pooled_var)
+        d = 0.0 if pooled_std == 0 else (mean2 - mean1) / pooled_std
         effect = self.interpret_effect_size(d)
 
         # Confidence intervals
-        _, ci1_lower, ci1_upper = self.bootstrap_confidence_interval(group1_data, confidence)
-        _, ci2_lower, ci2_upper = self.bootstrap_confidence_interval(group2_data, confidence)
+        ci1_lower, ci1_upper = _t_ci(mean1, std1, n1, confidence)
+        ci2_lower, ci2_upper = _t_ci(mean2, std2, n2, confidence)
 
         # Improvement calculations
         absolute_diff = mean2 - mean1
@@ -188,30 +345,109 @@ class StatisticalAnalyzer:
             percent_improvement=percent_improvement
         )
 
+    def compare_groups_batched(self, experiment_id: int, metric_names: List[str],
+                               group_by: str, group1_value: str, group2_value: str,
+                               confidence: float = 0.95) -> Dict[str, ComparisonResult]:
+        """Compare two groups on several metrics at once
+
+        Same results as calling compare_two_groups per metric, but one query
+        fetches every metric and each group's statistics are computed once
+        over an (n, metrics) matrix. A metric that is NULL in some runs is
+        compared on its non-null values through the single-metric path.
+        """
+        cursor = self._cursor()
+        group_by = self._column("runs", group_by)
+        columns = ", ".join(f"m.{self._column('metrics', name)}" for name in metric_names)
+
+        # SQLite evaluates the group test so its type affinity matches compare_two_groups
+        cursor.execute(f"""
+            SELECT r.{group_by} = ?, {columns}
+            FROM metrics m
+            JOIN runs r ON m.run_id = r.id
+            WHERE r.experiment_id = ? AND r.{group_by} IN (?, ?)
+        """, (group1_value, experiment_id, group1_value, group2_value))
+        rows = np.array(cursor.fetchall(), dtype=np.float64).reshape(-1, len(metric_names) + 1)
+        in_group1 = rows[:, 0] == 1
+        group1_matrix, group2_matrix = rows[in_group1, 1:], rows[~in_group1, 1:]
+
+        complete = ~(np.isnan(group1_matrix).any(axis=0) | np.isnan(group2_matrix).any(axis=0))
+        if len(group1_matrix) == 0 or len(group2_matrix) == 0:
+            complete[:] = False
+
+        results = {}
+        if complete.any():
+            x1, x2 = group1_matrix[:, complete], group2_matrix[:, complete]
+            n1, n2 = len(x1), len(x2)
+            mean1, mean2 = x1.mean(axis=0), x2.mean(axis=0)
+            m2_1 = np.square(x1 - mean1).sum(axis=0)
+            m2_2 = np.square(x2 - mean2).sum(axis=0)
+            std1 = np.sqrt(m2_1 / (n1 - 1)) if n1 > 1 else np.full_like(mean1, np.nan)
+            std2 = np.sqrt(m2_2 / (n2 - 1)) if n2 > 1 else np.full_like(mean2, np.nan)
+            dof = n1 + n2 - 2
+            pooled_var = (m2_1 + m2_2) / dof if dof > 0 else np.full_like(mean1, np.nan)
+
+            # Pooled-variance t-tests and effect sizes for every metric
+            t_stats, p_values = stats.ttest_ind_from_stats(mean1, std1, n1, mean2, std2, n2, equal_var=True)
+            pooled_std = np.sqrt(pooled_var)
+
+            ci1 = _t_ci(mean1, std1, n1, confidence)
+            ci2 = _t_ci(mean2, std2, n2, confidence)
+
+            for k, name in enumerate(np.asarray(metric_names, dtype=object)[complete]):
+                d = 0.0 if pooled_std[k] == 0 else (mean2[k] - mean1[k]) / pooled_std[k]
+                absolute_diff = mean2[k] - mean1[k]
+                results[name] = ComparisonResult(
+                    group1_name=str(group1_value),
+                    group2_name=str(group2_value),
+                    group1_mean=mean1[k],
+                    group2_mean=mean2[k],
+                    group1_std=std1[k],
+                    group2_std=std2[k],
+                    group1_n=n1,
+                    group2_n=n2,
+                    t_statistic=t_stats[k],
+                    p_value=p_values[k],
+                    significant=(p_values[k] < 0.05),
+                    cohens_d=d,
+                    effect_interpretation=self.interpret_effect_size(d),
+                    group1_ci_lower=ci1[0][k],
+                    group1_ci_upper=ci1[1][k],
+                    group2_ci_lower=ci2[0][k],
+                    group2_ci_upper=ci2[1][k],
+                    absolute_difference=absolute_diff,
+                    percent_improvement=(absolute_diff / mean1[k] * 100) if mean1[k] != 0 else 0.0
+                )
+
+        for k, name in enumerate(metric_names):
+            if not complete[k]:
+                column1, column2 = group1_matrix[:, k], group2_matrix[:, k]
+                results[name] = self._compare_samples(
+                    group1_value, group2_value,
+                    column1[~np.isnan(column1)], column2[~np.isnan(column2)], confidence
+                )
+
+        return {name: results[name] for name in metric_names}
+
     def anova_analysis(self, experiment_id: int, metric_name: str,
                       group_by: str) -> Dict:
-        """Perform one-way ANOVA for multiple groups"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """Perform one-way ANOVA for multiple groups
 
-        # Get unique group values
-        cursor.execute(f"""
-            SELECT DISTINCT {group_by}
-            FROM runs
-            WHERE experiment_id = ?
-            ORDER BY {group_by}
-        """, (experiment_id,))
-        groups = [row[0] for row in cursor.fetchall()]
-        conn.close()
+        Results are memoized per (experiment_id, metric_name, group_by), so
+        repeated calls return the same dict until invalidate_cache().
+        """
+        key = (experiment_id, metric_name, group_by)
+        cached = self._anova_results.get(key)
+        if cached is not None:
+            return cached
+
+        # Every group with its metric values, in one query
+        grouped = self._fetch_metric_grouped(experiment_id, metric_name, group_by)
+        groups = list(grouped)
 
         if len(groups) < 2:
             raise ValueError("Need at least 2 groups for ANOVA")
 
-        # Get data for each group
-        group_data = []
-        for group in groups:
-            data = self.get_metric_values(experiment_id, metric_name, group_by, group)
-            group_data.append(data)
+        group_data = list(grouped.values())
 
         # Perform ANOVA
         f_stat, p_value = stats.f_oneway(*group_data)
@@ -219,51 +455,52 @@ class StatisticalAnalyzer:
         # Post-hoc pairwise comparisons (if significant)
         pairwise_comparisons = []
         if p_value < 0.05:
-            for i in range(len(groups)):
-                for j in range(i + 1, len(groups)):
-                    try:
-                        comparison = self.compare_two_groups(
-                            experiment_id, metric_name, group_by,
-                            groups[i], groups[j]
-                        )
-                        pairwise_comparisons.append(comparison)
-                    except ValueError:
-                        continue
-
-        return {
+            pairs = [(groups[i], groups[j])
+                     for i in range(len(groups)) for j in range(i + 1, len(groups))]
+            # Each comparison is closed-form on the fetched arrays, so they run inline
+            for g1, g2 in pairs:
+                try:
+                    comparison = self._compare_samples(g1, g2, grouped[g1], grouped[g2])
+                    pairwise_comparisons.append(comparison)
+                except ValueError:
+                    continue
+
+        result = {
             'groups': groups,
             'f_statistic': f_stat,
             'p_value': p_value,
             'significant': (p_value < 0.05),
             'pairwise_comparisons': pairwise_comparisons,
-            'group_means': [np.mean(data) if data else 0 for data in group_data],
-            'group_stds': [np.std(data, ddof=1) if data else 0 for data in group_data],
+            'group_means': [np.mean(data) if len(data) else 0 for data in group_data],
+            'group_stds': [np.std(data, ddof=1) if len(data) else 0 for data in group_data],
             'group_ns': [len(data) for data in group_data]
         }
+        self._anova_results[key] = result
+        return result
 
     def correlation_analysis(self, experiment_id: int,
                             metric1_name: str, metric2_name: str) -> Dict:
         """Calculate correlation between two metrics"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self._cursor()
+        metric1_name = self._column("metrics", metric1_name)
+        metric2_name = self._column("metrics", metric2_name)
 
         cursor.execute(f"""
-            SELECT {metric1_name}, {metric2_name}
+            SELECT m.{metric1_name}, m.{metric2_name}
             FROM metrics m
             JOIN runs r ON m.run_id = r.id
             WHERE r.experiment_id = ?
-            AND {metric1_name} IS NOT NULL
-            AND {metric2_name} IS NOT NULL
+            AND m.{metric1_name} IS NOT NULL
+            AND m.{metric2_name} IS NOT NULL
         """, (experiment_id,))
 
-        data = cursor.fetchall()
-        conn.close()
+        # Rows stream straight into an (N, 2) array; x and y are column views of it
+        data = np.fromiter(cursor, dtype=np.dtype((np.float64, 2)))
 
         if len(data) < 3:
             raise ValueError("Insufficient data for correlation")
 
-        x = [row[0] for row in data]
-        y = [row[1] for row in data]
+        x, y = data[:, 0], data[:, 1]
 
         # Pearson correlation
         r_pearson, p_pearson = stats.pearsonr(x, y)
@@ -299,8 +536,8 @@ class StatisticalAnalyzer:
         # One-sample t-test against baseline
         t_stat, p_value = stats.ttest_1samp(data, baseline_value)
 
-        # Bootstrap CI
-        _, ci_lower, ci_upper = self.bootstrap_confidence_interval(data)
+        # t-based CI for the mean, under the same model as the t-test above
+        ci_lower, ci_upper = _t_ci(mean, std, n)
 
         # Improvement over baseline
         absolute_diff = mean - baseline_value
@@ -381,16 +618,21 @@ class StatisticalAnalyzer:
         print("\n" + "="*80 + "\n")
 
 
-def calculate_sample_size(effect_size: float, alpha: float = 0.05,
-                         power: float = 0.80) -> int:
-    """Calculate required sample size for detecting an effect"""
-    from scipy.stats import norm
+@lru_cache(maxsize=64)
+def _z(alpha: float, power: float) -> Tuple[float, float]:
+    """Two-sided critical z for alpha and z for the desired power"""
+    return float(stats.norm.ppf(1 - alpha/2)), float(stats.norm.ppf(power))
+
 
-    z_alpha = norm.ppf(1 - alpha/2)
-    z_beta = norm.ppf(power)
+def calculate_sample_size(effect_size: Union[float, np.ndarray], alpha: float = 0.05,
+                         power: float = 0.80) -> Union[int, np.ndarray]:
+    """Calculate required sample size for detecting an effect (per-element for arrays)"""
+    z_alpha, z_beta = _z(alpha, power)
 
-    n = ((z_alpha + z_beta) ** 2 * 2) / (effect_size ** 2)
-    return int(np.ceil(n))
+    n = np.ceil(((z_alpha + z_beta) ** 2 * 2) / np.square(effect_size))
+    if np.ndim(n) == 0:
+        return int(n)
+    return n.astype(int)
 
 
 if __name__ == "__main__":
@@ -24,9 +24,9 @@ import time
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from app.multi_agent_runner import run_multi_agent_session
+from app.multi_agent_runner import run_multi_agent_session, shutdown_browser_pool
 from app.browser_adapter import BrowserAdapter
-from app.storage import SessionStorage
+from app.storage import SessionStorage, load_proposals
 from app.multi_agent_committee import MultiAgentCommittee
 from app.schemas import Persona
 from experiments.metrics_collector import MetricsCollector
@@ -34,6 +34,21 @@ from experiments.bug_injector import BugInjector
 from experiments.regressions import RegressionManager
 
 
+def _jsonl_row(line: str) -> Dict[str, str]:
+    """Map one JSONL session record onto the string cells csv.DictReader yields."""
+    row = {}
+    for key, value in json.loads(line).items():
+        if key == 'validators':
+            row[key] = ";".join(value) if value else ""
+        elif isinstance(value, (dict, list)):
+            row[key] = json.dumps(value)
+        elif value is None:
+            row[key] = ""
+        else:
+            row[key] = str(value)
+    return row
+
+
 class ExperimentRunner:
     """Manages experiment execution"""
 
@@ -182,6 +197,8 @@ class ExperimentRunner:
                         print(f"  Traceback: {traceback.format_exc()}")
                         continue
 
+        await shutdown_browser_pool()
+
         print(f"\n{'='*80}")
         print(f"Experiment Complete: {self.config['name']}")
         print(f"Successful Runs: {successful_runs}/{total_runs}")
@@ -284,17 +301,32 @@ class ExperimentRunner:
         return run_id
 
     def _import_csv_to_database(self, run_id: int, csv_path: str) -> None:
-        """Import CSV data from existing run into database"""
+        """Import CSV data from existing run into database
+
+        Reads both session formats: JSONL records are mapped onto the CSV
+        cells first. Sessions logged with session_dedupe_proposals store only
+        a key in the agent_proposals column; keys are resolved through the
+        session's proposals.jsonl.
+        """
         import csv
 
         if not Path(csv_path).exists():
             raise FileNotFoundError(f"CSV file not found: {csv_path}")
 
+        test_folder = Path(csv_path).parent
+        interned = load_proposals(test_folder) if (test_folder / "proposals.jsonl").exists() else {}
+
+        def decode(raw: str):
+            return interned[raw] if raw in interned else json.loads(raw)
+
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
 
-        with open(csv_path, 'r') as f:
-            reader = csv.DictReader(f)
+        with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+            if Path(csv_path).suffix == '.jsonl':
+                reader = (_jsonl_row(line) for line in f if line.strip())
+            else:
+                reader = csv.DictReader(f)
             for row in reader:
                 # Parse turn data
                 turn = int(row.get('turn', 0))
@@ -335,7 +367,7 @@ class ExperimentRunner:
                     row.get('success', 'False') == 'True',
                     row.get('safety_pass', 'True') == 'True',
                     float(row.get('latency', 0.0) or 0.0),
-                    len(json.loads(row.get('agent_proposals', '[]'))) if row.get('agent_proposals') else 1,
+                    len(decode(row.get('agent_proposals', '[]'))) if row.get('agent_proposals') else 1,
                     100.0,  # Calculate from proposals if needed
                     confidence_score,
                     True,
@@ -345,7 +377,7 @@ class ExperimentRunner:
                 # Parse and insert proposals
                 if row.get('agent_proposals'):
                     try:
-                        proposals = json.loads(row['agent_proposals'])
+                        proposals = decode(row['agent_proposals'])
                         for i, proposal in enumerate(proposals):
                             cursor.execute("""
                                 INSERT INTO proposals (
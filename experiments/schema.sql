@@ -313,6 +313,12 @@ CREATE TABLE IF NOT EXISTS baselines (
 -- ============================================================================
 CREATE INDEX IF NOT EXISTS idx_runs_experiment ON runs(experiment_id);
 CREATE INDEX IF NOT EXISTS idx_runs_session ON runs(session_id);
+-- (experiment_id, group column) indexes cover the per-configuration group_by queries
+-- in analysis.py / metrics_collector.py and return runs already ordered by group
+CREATE INDEX IF NOT EXISTS idx_runs_experiment_agents ON runs(experiment_id, num_agents);
+CREATE INDEX IF NOT EXISTS idx_runs_experiment_persona ON runs(experiment_id, persona_name);
+CREATE INDEX IF NOT EXISTS idx_runs_experiment_scenario ON runs(experiment_id, scenario_name);
+CREATE INDEX IF NOT EXISTS idx_runs_experiment_provider ON runs(experiment_id, model_provider);
 CREATE INDEX IF NOT EXISTS idx_metrics_run ON metrics(run_id);
 CREATE INDEX IF NOT EXISTS idx_bugs_run ON bugs(run_id);
 CREATE INDEX IF NOT EXISTS idx_bugs_experiment ON bugs(experiment_id);
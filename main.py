@@ -1,7 +1,8 @@
 import argparse
 import asyncio
+import logging
 
-from app.multi_agent_runner import run_multi_agent_session
+from app.multi_agent_runner import run_multi_agent_session, shutdown_browser_pool
 from app.persona import load_persona, load_scenario
 
 
@@ -25,19 +26,33 @@ async def main() -> None:
         default=4,
         help="Number of agents in the committee (default: 4 - OpenAI, Google, Anthropic, xAI)",
     )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="count",
+        default=0,
+        help="Show per-turn progress (-v) or full committee/observation detail (-vv)",
+    )
 
     args = parser.parse_args()
 
+    # Per-turn output goes through logging; only warnings and errors by default
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    logging.getLogger("app").setLevel({0: logging.WARNING, 1: logging.INFO}.get(args.verbose, logging.DEBUG))
+
     # Load persona and scenario
     persona = load_persona(args.persona)
     scenario = load_scenario(args.scenario)
 
     # Run multi-agent session
-    result = await run_multi_agent_session(
-        persona=persona,
-        scenario=scenario,
-        num_agents=args.agents,
-    )
+    try:
+        result = await run_multi_agent_session(
+            persona=persona,
+            scenario=scenario,
+            num_agents=args.agents,
+        )
+    finally:
+        await shutdown_browser_pool()
 
     # Print final summary
     if result["success"]:
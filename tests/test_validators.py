@@ -0,0 +1,57 @@
+"""Safety scanning: every backend reports the first matching pattern in list order."""
+import random
+import re
+
+import pytest
+
+from app import validators
+
+SAMPLES = [
+    "",
+    "plain text",
+    "x'; y --",
+    "`ls` $(id) ;rm -rf /",
+    "price:0 then price: 99999",
+    'quantity": 0 and quantity: 500',
+    "stock: -3",
+    "héllo ../ ' or 1=1 --",
+    "<SCRIPT src=x> javascript:alert(1)",
+]
+
+
+def _fuzz_texts(n: int = 20000):
+    rng = random.Random(0)
+    alphabet = list("'\";<>|&`$./\\=:- 0123456789") + [
+        "price:", "quantity:", "stock:", "OR 1=1", "DROP TABLE", "../",
+        "<script>", "rm -rf", " 0.0", "99999", "é",
+    ]
+    for _ in range(n):
+        yield "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+
+
+def _reference(text: str):
+    """The original per-pattern loop: first pattern in each category's list that matches."""
+    reasons = []
+    for category, _, patterns in validators.CATEGORIES:
+        for pattern in patterns:
+            if re.search(pattern, text, re.IGNORECASE):
+                reasons.append(f"safety:{category}:{pattern}")
+                break
+    return reasons
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+def test_re_scan_matches_reference(text):
+    assert validators._scan_re(text) == _reference(text)
+
+
+def test_re_scan_matches_reference_fuzz():
+    for text in _fuzz_texts():
+        assert validators._scan_re(text) == _reference(text), text
+
+
+def test_hyperscan_matches_re_scan():
+    pytest.importorskip("hyperscan")
+    scanner = validators._HS_SCANNER
+    for text in [*SAMPLES, *_fuzz_texts()]:
+        assert scanner.scan(text) == validators._scan_re(text), text